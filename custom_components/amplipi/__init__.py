@@ -1,25 +1,102 @@
 """The AmpliPi integration."""
 from __future__ import annotations
 
+import shutil
+import time
+from datetime import timedelta
+
+from aiohttp import ClientTimeout
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_PORT, CONF_NAME, CONF_ID
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_HOST, CONF_PORT, CONF_NAME, CONF_ID, EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from pyamplipi.amplipi import AmpliPi
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, AMPLIPI_OBJECT, CONF_VENDOR, CONF_VERSION, CONF_WEBAPP, CONF_API_PATH
+from .artwork import AlbumArtCache
+from .client import AmpliPiClient, StatusHedger, create_controller_session
+from .const import DOMAIN, AMPLIPI_OBJECT, COORDINATOR, CONF_VENDOR, CONF_VERSION, CONF_WEBAPP, CONF_API_PATH, \
+    CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS, STATUS_FRESHNESS, CONF_MIN_SCAN_INTERVAL, \
+    DEFAULT_MIN_SCAN_INTERVAL, CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL, ARTWORK, ARTWORK_MEMORY_SIZE, \
+    ARTWORK_DISK_SIZE, STORAGE_VERSION, PROBED_STATUS, PROBE_FRESHNESS, CONNECTION_POOL_EXTRA, CONNECTION_KEEPALIVE, \
+    DNS_CACHE_TTL, CONNECT_TIMEOUT, STATUS_READ_TIMEOUT, COMMAND_TIMEOUT, CONF_HEDGE_STATUS_READS, HEDGE_PERCENTILE, \
+    HEDGE_MAX_RATIO, HEDGE_MIN_DELAY, HEDGE_MIN_SAMPLES
+from .coordinator import AmpliPiDataUpdateCoordinator
+from .push import AmpliPiPushListener
+from .services import async_setup_services
 
 PLATFORMS = ["media_player"]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the AmpliPi services."""
+    await async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
+    endpoint = f'http://{entry.data[CONF_HOST]}:{entry.data[CONF_PORT]}/api/'
+    max_concurrent = entry.options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS)
+    session, connection_stats = create_controller_session(
+        max_concurrent + CONNECTION_POOL_EXTRA, CONNECTION_KEEPALIVE, DNS_CACHE_TTL)
+    entry.async_on_unload(session.close)
+
+    async def _async_close_session(_event: Event) -> None:
+        await session.close()
+
+    # like the sessions Home Assistant creates, close it on shutdown too, where entries are not unloaded
+    entry.async_on_unload(hass.bus.async_listen(EVENT_HOMEASSISTANT_CLOSE, _async_close_session))
+
+    hedger = None
+    if entry.options.get(CONF_HEDGE_STATUS_READS, False):
+        hedger = StatusHedger(HEDGE_PERCENTILE, HEDGE_MAX_RATIO, HEDGE_MIN_DELAY, HEDGE_MIN_SAMPLES)
+
+    amplipi = AmpliPiClient(
+        endpoint,
+        STATUS_READ_TIMEOUT,
+        http_session=session,
+        freshness=STATUS_FRESHNESS,
+        max_concurrent=max_concurrent,
+        read_timeout=ClientTimeout(total=None, connect=CONNECT_TIMEOUT, sock_read=STATUS_READ_TIMEOUT),
+        write_timeout=ClientTimeout(total=COMMAND_TIMEOUT, connect=CONNECT_TIMEOUT),
+        connection_stats=connection_stats,
+        hedger=hedger,
+    )
+
+    coordinator = AmpliPiDataUpdateCoordinator(
+        hass,
+        amplipi,
+        entry.data[CONF_NAME],
+        min_interval=timedelta(seconds=entry.options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL)),
+        max_interval=timedelta(seconds=entry.options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL)),
+        store=_status_store(hass, entry),
+    )
+    restored = False
+    probed = hass.data.get(PROBED_STATUS, {}).pop((entry.data[CONF_HOST], entry.data[CONF_PORT]), None)
+    if probed is not None and time.monotonic() - probed[0] < PROBE_FRESHNESS:
+        # the config flow just fetched the status, no need to ask again
+        coordinator.async_seed(probed[1])
+    else:
+        # with a status saved by the previous run the entities start from it and the live status follows
+        restored = await coordinator.async_restore()
+        if not restored:
+            await coordinator.async_config_entry_first_refresh()
+
+    push_listener = AmpliPiPushListener(hass, coordinator, session, endpoint)
+    push_listener.async_start()
+    entry.async_on_unload(push_listener.async_stop)
+
+    # album art is fetched on demand by the frontend and should not hold connections the polling needs
+    artwork = AlbumArtCache(hass, async_get_clientsession(hass), _artwork_path(hass, entry), ARTWORK_MEMORY_SIZE, ARTWORK_DISK_SIZE)
+
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
-        AMPLIPI_OBJECT: AmpliPi(
-            f'http://{entry.data[CONF_HOST]}:{entry.data[CONF_PORT]}/api/',
-            10,
-            http_session=async_get_clientsession(hass)
-        ),
+        AMPLIPI_OBJECT: amplipi,
+        COORDINATOR: coordinator,
+        ARTWORK: artwork,
         CONF_VENDOR: entry.data[CONF_VENDOR],
         CONF_NAME: entry.data[CONF_NAME],
         CONF_HOST: entry.data[CONF_HOST],
@@ -31,10 +108,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    if restored:
+        entry.async_create_background_task(hass, coordinator.async_refresh(), f"{DOMAIN} reconcile stored status")
 
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
@@ -42,3 +128,17 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the status and album art stored for a removed config entry."""
+    await _status_store(hass, entry).async_remove()
+    await hass.async_add_executor_job(shutil.rmtree, _artwork_path(hass, entry), True)
+
+
+def _status_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.status")
+
+
+def _artwork_path(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}_artwork", entry.entry_id)
@@ -0,0 +1,231 @@
+"""Local cache for album art served by the AmpliPi web app."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+_FETCH_TIMEOUT = ClientTimeout(total=10)
+# maps each url to the content it was last served with, so the disk cache survives restarts
+_INDEX_FILE = 'index.json'
+# urls remembered in the index, least recently requested first out
+_MAX_URLS = 512
+# concurrent requests for one url share a lock; a fixed set of locks keeps them from piling up per url
+_LOCK_STRIPES = 16
+
+
+def artwork_hash(url: Optional[str], *identity: Optional[str]) -> Optional[str]:
+    """Return a media_image_hash that only changes when the image url or the track it belongs to changes.
+
+    Some streams keep serving their current cover under one fixed url, so the
+    track identity is part of the hash to make browsers reload it on track
+    changes and keep it cached otherwise.
+    """
+    if url is None:
+        return None
+    key = '\n'.join([url, *(part or '' for part in identity)])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+
+class _CachedImage:
+    """What is known about the image last served under one url."""
+
+    def __init__(self, content_hash: str, content_type: str, etag: Optional[str], last_modified: Optional[str],
+                 image_hash: Optional[str] = None):
+        self.content_hash = content_hash
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        # the media_image_hash the image was last checked with the controller for
+        self.image_hash = image_hash
+
+    def __eq__(self, other):
+        return isinstance(other, _CachedImage) and vars(self) == vars(other)
+
+
+class AlbumArtCache:
+    """Serves album art through the integration instead of from the controller on every page load.
+
+    Image bodies are stored by content hash, so identical covers under
+    different urls are kept once, in a size-bounded in-memory LRU backed by
+    a size-bounded directory on disk. Each url remembers the content hash
+    and validators it was last served with. A cached image is served as it
+    is while the entity's media_image_hash stays the same; once the hash
+    changes it is revalidated with the controller, which answers 304
+    without a body when nothing changed.
+    """
+
+    def __init__(self, hass: HomeAssistant, session: ClientSession, directory: str,
+                 max_memory: int, max_disk: int):
+        self._hass = hass
+        self._session = session
+        self._directory = directory
+        self._max_memory = max_memory
+        self._max_disk = max_disk
+        self._urls: OrderedDict[str, _CachedImage] = OrderedDict()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_size = 0
+        self._locks = [asyncio.Lock() for _ in range(_LOCK_STRIPES)]
+        self._index_loaded = False
+
+    async def async_get(self, url: str, image_hash: Optional[str] = None) -> tuple[Optional[bytes], Optional[str]]:
+        """Return the image body and content type for a url, fetching it at most once per change.
+
+        Without an image_hash every request revalidates the cached image.
+        """
+        # concurrent requests for one url, e.g. every zone on the same source, share one fetch
+        async with self._locks[hash(url) % _LOCK_STRIPES]:
+            return await self._async_get(url, image_hash)
+
+    async def _async_get(self, url: str, image_hash: Optional[str]) -> tuple[Optional[bytes], Optional[str]]:
+        if not self._index_loaded:
+            self._index_loaded = True
+            self._urls.update(await self._hass.async_add_executor_job(self._read_index))
+        cached = self._urls.get(url)
+        content = None
+        if cached is not None:
+            self._urls.move_to_end(url)
+            content = await self._async_load(cached.content_hash)
+            if content is None:
+                # the body was evicted from disk, so fetch it again
+                del self._urls[url]
+            elif image_hash is not None and cached.image_hash == image_hash:
+                # the track is the same as when the image was last checked
+                return content, cached.content_type
+
+        headers = {}
+        if content is not None:
+            if cached.etag is not None:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified is not None:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        try:
+            async with self._session.get(url, headers=headers, timeout=_FETCH_TIMEOUT) as response:
+                if response.status == 304 and content is not None:
+                    cached.image_hash = image_hash
+                    return content, cached.content_type
+                if response.status != 200:
+                    _LOGGER.debug(f"AmpliPi album art {url} returned {response.status}")
+                    return (content, cached.content_type) if content is not None else (None, None)
+                content = await response.read()
+                content_type = response.content_type
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except (ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug(f"Could not fetch AmpliPi album art {url}: {err}")
+            # an image we already have is better than none while the controller is unreachable
+            return (content, cached.content_type) if content is not None else (None, None)
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        image = _CachedImage(content_hash, content_type, etag, last_modified, image_hash)
+        self._remember(content_hash, content)
+        evicted = await self._hass.async_add_executor_job(self._write, content_hash, content)
+        if image == self._urls.get(url) and not evicted:
+            return content, content_type
+
+        self._urls[url] = image
+        self._urls.move_to_end(url)
+        for other in [other for other, cached in self._urls.items() if cached.content_hash in evicted]:
+            del self._urls[other]
+        while len(self._urls) > _MAX_URLS:
+            self._urls.popitem(last=False)
+        index = {url: vars(image) for url, image in self._urls.items()}
+        await self._hass.async_add_executor_job(self._write_index, index)
+        return content, content_type
+
+    async def _async_load(self, content_hash: str) -> Optional[bytes]:
+        content = self._memory.get(content_hash)
+        if content is not None:
+            self._memory.move_to_end(content_hash)
+            # keep the file on disk recently used as well, its modification time orders disk eviction
+            self._hass.async_add_executor_job(self._touch, content_hash)
+            return content
+        content = await self._hass.async_add_executor_job(self._read, content_hash)
+        if content is not None:
+            self._remember(content_hash, content)
+        return content
+
+    def _remember(self, content_hash: str, content: bytes):
+        if content_hash in self._memory:
+            self._memory.move_to_end(content_hash)
+            return
+        self._memory[content_hash] = content
+        self._memory_size += len(content)
+        while self._memory_size > self._max_memory and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self._directory, content_hash)
+
+    def _touch(self, content_hash: str):
+        try:
+            os.utime(self._path(content_hash))
+        except OSError:
+            pass
+
+    def _read(self, content_hash: str) -> Optional[bytes]:
+        path = self._path(content_hash)
+        try:
+            with open(path, 'rb') as file:
+                content = file.read()
+            # the modification time orders the files for eviction
+            os.utime(path)
+            return content
+        except OSError:
+            return None
+
+    def _read_index(self) -> dict[str, _CachedImage]:
+        try:
+            with open(self._path(_INDEX_FILE), encoding='utf-8') as file:
+                return {url: _CachedImage(**image) for url, image in json.load(file).items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def _write_index(self, index: dict):
+        try:
+            with open(self._path(_INDEX_FILE), 'w', encoding='utf-8') as file:
+                json.dump(index, file)
+        except OSError as err:
+            _LOGGER.debug(f"Could not store the AmpliPi album art index: {err}")
+
+    def _write(self, content_hash: str, content: bytes) -> set[str]:
+        """Store an image body unless it is already on disk, returning the content hashes evicted for it."""
+        path = self._path(content_hash)
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            if os.path.exists(path):
+                os.utime(path)
+                return set()
+            with open(path, 'wb') as file:
+                file.write(content)
+            return self._evict()
+        except OSError as err:
+            _LOGGER.debug(f"Could not store AmpliPi album art on disk: {err}")
+            return set()
+
+    def _evict(self) -> set[str]:
+        files = []
+        for entry in os.scandir(self._directory):
+            if entry.is_file() and entry.name != _INDEX_FILE:
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.name))
+        total = sum(size for _, size, _ in files)
+        evicted = set()
+        for _, size, name in sorted(files):
+            if total <= self._max_disk:
+                break
+            os.remove(self._path(name))
+            evicted.add(name)
+            total -= size
+        return evicted
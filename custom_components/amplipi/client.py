@@ -0,0 +1,498 @@
+"""Client layer wrapped around the pyamplipi AmpliPi client."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, TraceConfig
+from homeassistant.util.json import json_loads
+from pyamplipi.amplipi import AmpliPi, json_ser_kwargs
+from pyamplipi.client import Client, headers_or_default
+from pyamplipi.error import APIError
+from pyamplipi.models import Status, SourceUpdate, MultiZoneUpdate, ZoneUpdate, GroupUpdate
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+_request_priority: ContextVar[int] = ContextVar("amplipi_request_priority", default=PRIORITY_BACKGROUND)
+
+
+def interactive_command(func):
+    """Run an entity service method, and every request it makes, in the interactive lane."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = _request_priority.set(PRIORITY_INTERACTIVE)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _request_priority.reset(token)
+
+    return wrapper
+
+
+class _LaneStats:
+    """Queue metrics for one priority lane."""
+
+    def __init__(self):
+        self.waiting = 0
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "average_wait": self.total_wait / self.requests if self.requests else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+class RequestScheduler:
+    """Bounds how many requests are in flight to a single controller.
+
+    Each controller gets its own scheduler, so a slow controller only delays
+    its own requests and separate controllers never wait on each other. When
+    requests have to queue, interactive ones (user commands) are always
+    granted a slot before background ones (polling).
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.lanes = {priority: _LaneStats() for priority in _PRIORITY_NAMES}
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    @property
+    def interactive_pending(self) -> bool:
+        """Whether any interactive request is queued."""
+        return self.lanes[PRIORITY_INTERACTIVE].waiting > 0
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            **{name: self.lanes[priority].as_dict() for priority, name in _PRIORITY_NAMES.items()},
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: int | None = None):
+        """Wait for a free request slot and hold it for the duration of the block.
+
+        Without an explicit priority the lane of the calling context is used.
+        """
+        if priority is None:
+            priority = _request_priority.get()
+        lane = self.lanes[priority]
+        start = time.monotonic()
+
+        if self.in_flight < self.limit and not self._queue:
+            self.in_flight += 1
+        else:
+            granted = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queue, (priority, next(self._sequence), granted))
+            lane.waiting += 1
+            try:
+                await granted
+            except asyncio.CancelledError:
+                if granted.done() and not granted.cancelled():
+                    # the slot was handed over just as we were cancelled
+                    self._release()
+                else:
+                    self._discard(granted)
+                raise
+            finally:
+                lane.waiting -= 1
+
+        wait = time.monotonic() - start
+        lane.requests += 1
+        lane.total_wait += wait
+        lane.max_wait = max(lane.max_wait, wait)
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _discard(self, granted: asyncio.Future):
+        self._queue = [entry for entry in self._queue if entry[2] is not granted]
+        heapq.heapify(self._queue)
+
+    def _release(self):
+        while self._queue:
+            _, _, granted = heapq.heappop(self._queue)
+            if not granted.done():
+                # the slot passes straight to the next waiter, in_flight is unchanged
+                granted.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class ConnectionStats:
+    """Counts how often requests to a controller open a new connection instead of reusing one."""
+
+    def __init__(self):
+        self.created = 0
+        self.reused = 0
+
+    def trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_create)
+        trace_config.on_connection_reuseconn.append(self._on_reuse)
+        return trace_config
+
+    async def _on_create(self, session, context, params):
+        self.created += 1
+
+    async def _on_reuse(self, session, context, params):
+        self.reused += 1
+
+    def as_dict(self) -> dict:
+        total = self.created + self.reused
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "reuse_ratio": self.reused / total if total else 0.0,
+        }
+
+
+def create_controller_session(limit: int, keepalive: float, dns_ttl: int) -> tuple[ClientSession, ConnectionStats]:
+    """Create an HTTP session with its own connection pool for a single controller.
+
+    Keeping controller traffic off the shared Home Assistant session means it
+    never waits for connections held by other integrations, and idle sockets
+    to the controller are kept alive between polls.
+    """
+    stats = ConnectionStats()
+    connector = TCPConnector(
+        limit=limit,
+        limit_per_host=limit,
+        keepalive_timeout=keepalive,
+        use_dns_cache=True,
+        ttl_dns_cache=dns_ttl,
+    )
+    return ClientSession(connector=connector, trace_configs=[stats.trace_config()]), stats
+
+
+class _ScheduledClient(Client):
+    """pyamplipi HTTP client that runs every request through a scheduler and reports writes.
+
+    Writes are always user commands and go through the interactive lane.
+    Reads and writes use their own timeouts, so a command fails fast while a
+    large status document still has time to arrive.
+    """
+
+    def __init__(self, endpoint: str, timeout: int, http_session: Optional[ClientSession],
+                 scheduler: RequestScheduler, on_write: Callable[[], None],
+                 read_timeout: ClientTimeout, write_timeout: ClientTimeout):
+        super().__init__(endpoint, timeout, http_session)
+        self._scheduler = scheduler
+        self._on_write = on_write
+        self._read_timeout = read_timeout
+        self._write_timeout = write_timeout
+
+    async def _request(self, method: str, path: str, timeout: ClientTimeout, body=None, headers=None) -> dict:
+        async with self._http_session.request(
+                method,
+                self.url(path),
+                data=body,
+                timeout=timeout,
+                headers=headers_or_default(headers),
+        ) as response:
+            return await self._process_response(response)
+
+    async def get_raw(self, path: str, headers: Optional[dict] = None) -> tuple[int, bytes, Optional[str]]:
+        """Read a document without decoding it, returning the HTTP status, the body and its ETag."""
+        async with self._scheduler.slot():
+            async with self._http_session.get(
+                    self.url(path),
+                    timeout=self._read_timeout,
+                    headers={**headers_or_default(), **(headers or {})},
+            ) as response:
+                if response.status >= 400:
+                    await self._handle_error(response)
+                return response.status, await response.read(), response.headers.get('ETag')
+
+    async def get(self, path: str, headers=None, expect_json: bool = True, outfile: Optional[str] = None) -> dict:
+        async with self._scheduler.slot():
+            if not expect_json:
+                return await super().get(path, headers, expect_json, outfile)
+            return await self._request('GET', path, self._read_timeout, headers=headers)
+
+    async def delete(self, path: str, body=None, headers=None) -> dict:
+        self._on_write()
+        async with self._scheduler.slot(PRIORITY_INTERACTIVE):
+            return await self._request('DELETE', path, self._write_timeout, body, headers)
+
+    async def patch(self, path: str, body=None, headers=None) -> dict:
+        self._on_write()
+        async with self._scheduler.slot(PRIORITY_INTERACTIVE):
+            return await self._request('PATCH', path, self._write_timeout, body, headers)
+
+    async def post(self, path: str, body=None, headers=None, timeout=None) -> dict:
+        self._on_write()
+        # callers passing a timeout, such as announcements, expect the request to take that long
+        post_timeout = self._write_timeout if timeout is None else ClientTimeout(total=timeout)
+        async with self._scheduler.slot(PRIORITY_INTERACTIVE):
+            return await self._request('POST', path, post_timeout, body, headers)
+
+
+class StatusHedger:
+    """Decides when a slow status read gets a duplicate request and counts the outcome.
+
+    The hedge delay is the given percentile of recent read latencies, so only
+    reads slower than almost all of their predecessors are duplicated. Hedges
+    are limited to ``max_ratio`` of all reads, which caps the extra load on
+    the controller.
+    """
+
+    def __init__(self, percentile: float, max_ratio: float, min_delay: float, min_samples: int, window: int = 100):
+        self._percentile = percentile
+        self._max_ratio = max_ratio
+        self._min_delay = min_delay
+        self._min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=window)
+        self.reads = 0
+        self.fired = 0
+        self.won = 0
+
+    def record(self, latency: float):
+        self._latencies.append(latency)
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging the next read, or None when it may not be hedged."""
+        if len(self._latencies) < self._min_samples or self.fired >= self.reads * self._max_ratio:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self._percentile / 100))
+        return max(self._min_delay, ordered[index])
+
+    def stats(self) -> dict:
+        return {
+            "reads": self.reads,
+            "fired": self.fired,
+            "won": self.won,
+            "delay": self.delay(),
+        }
+
+
+class AmpliPiClient(AmpliPi):
+    """AmpliPi client that coalesces concurrent status reads into a single request.
+
+    Callers asking for the status while a read is already in flight attach to
+    that read and share its result. A status younger than ``freshness``
+    seconds is returned without contacting the controller at all. Any write
+    invalidates both, so a read issued after a command never sees the state
+    from before it. At most ``max_concurrent`` requests are in flight to the
+    controller at once.
+
+    The commands the coordinator sends return the status document the
+    controller answers with as decoded, without parsing it into pyamplipi
+    models, since the coordinator indexes the document itself.
+    """
+
+    def __init__(self, endpoint: str, timeout: int = 10, http_session: Optional[ClientSession] = None,
+                 freshness: float = 0.0, max_concurrent: int = 4, read_timeout: Optional[ClientTimeout] = None,
+                 write_timeout: Optional[ClientTimeout] = None, connection_stats: Optional[ConnectionStats] = None,
+                 hedger: Optional[StatusHedger] = None):
+        """Status reads use ``read_timeout`` and commands ``write_timeout``, both default to ``timeout`` seconds.
+
+        Pass the session from create_controller_session, whose ``connection_stats``
+        then report how often its pooled connections are reused.
+        """
+        super().__init__(endpoint, timeout, http_session=http_session)
+        self.scheduler = RequestScheduler(max_concurrent)
+        self.connection_stats = connection_stats
+        self.hedger = hedger
+        self._client = _ScheduledClient(
+            endpoint,
+            timeout,
+            http_session,
+            self.scheduler,
+            self.invalidate_status,
+            read_timeout or ClientTimeout(total=timeout),
+            write_timeout or ClientTimeout(total=timeout),
+        )
+        self._freshness = freshness
+        self._generation = 0
+        self._inflight: asyncio.Future | None = None
+        self._inflight_generation = -1
+        self._document: dict | None = None
+        self._document_generation = -1
+        self._document_time = 0.0
+        self._decoded: dict | None = None
+        self._decoded_digest: bytes | None = None
+        self._decoded_etag: str | None = None
+        # status bodies that matched the previous one and skipped parsing
+        self.unchanged_reads = 0
+
+    def invalidate_status(self):
+        """Forget the cached status and stop new readers joining the current request."""
+        self._generation += 1
+
+    async def get_document(self, path: str) -> Any:
+        """Read and decode a single API document, such as 'sources' or 'zones/3'."""
+        _, body, _ = await self._client.get_raw(path)
+        document = json_loads(body)
+        if isinstance(document, dict) and 'error' in document:
+            raise APIError(document['error'])
+        return document
+
+    async def get_status(self) -> Status:
+        """Return the controller status as pyamplipi models."""
+        return Status.model_validate(await self.get_status_document())
+
+    async def get_status_document(self) -> dict:
+        """Return the decoded controller status, sharing one request between concurrent callers.
+
+        The document is shared with every other caller and must not be modified.
+        """
+        generation = self._generation
+
+        if (
+            self._document is not None
+            and self._document_generation == generation
+            and time.monotonic() - self._document_time < self._freshness
+        ):
+            return self._document
+
+        if self._inflight is None or self._inflight_generation != generation:
+            self._inflight = asyncio.ensure_future(self._fetch_status(generation))
+            self._inflight_generation = generation
+            self._inflight.add_done_callback(self._inflight_done)
+
+        # shield so a cancelled caller does not cancel the read for everyone else
+        return await asyncio.shield(self._inflight)
+
+    async def _fetch_status(self, generation: int) -> dict:
+        if self.hedger is None:
+            document = await self._read_status()
+        else:
+            document = await self._hedged_status()
+        self._document = document
+        self._document_generation = generation
+        self._document_time = time.monotonic()
+        return document
+
+    async def _timed_status(self) -> dict:
+        start = time.monotonic()
+        document = await self._read_status()
+        self.hedger.record(time.monotonic() - start)
+        return document
+
+    async def _read_status(self) -> dict:
+        """Read the status and decode it with Home Assistant's fast JSON parser.
+
+        A body identical to the previous one, or a 304 answer to the ETag the
+        controller sent with it, returns the previously decoded document
+        instead of decoding it again.
+        """
+        headers = None
+        if self._decoded is not None and self._decoded_etag is not None:
+            headers = {'If-None-Match': self._decoded_etag}
+
+        code, body, etag = await self._client.get_raw('', headers)
+        if code == 304 and self._decoded is not None:
+            self.unchanged_reads += 1
+            return self._decoded
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if digest == self._decoded_digest and self._decoded is not None:
+            self.unchanged_reads += 1
+            return self._decoded
+
+        document = json_loads(body)
+        if not isinstance(document, dict):
+            raise APIError(f"Unexpected status document: {body[:100]!r}")
+        if 'error' in document:
+            raise APIError(document['error'])
+        self._decoded, self._decoded_digest, self._decoded_etag = document, digest, etag
+        return document
+
+    async def _hedged_status(self) -> dict:
+        """Read the status, sending one duplicate request when the first is slower than the hedger expects.
+
+        Whichever answer arrives first wins and the other request is cancelled.
+        """
+        hedger = self.hedger
+        hedger.reads += 1
+        delay = hedger.delay()
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self._timed_status())
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        hedger.fired += 1
+        hedge = asyncio.ensure_future(self._timed_status())
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            hedger.won += 1
+                        return task.result()
+            # both requests failed, report the original one
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if primary in pending:
+                # the read the hedge beat took at least this long, the delay has to see such stalls
+                hedger.record(time.monotonic() - started)
+
+    async def set_source(self, source_id: int, source_update: SourceUpdate) -> dict:
+        return await self._client.patch(f'sources/{source_id}', source_update.model_dump_json(**json_ser_kwargs))
+
+    async def set_zones(self, zone_update: MultiZoneUpdate) -> dict:
+        return await self._client.patch('zones', zone_update.model_dump_json(**json_ser_kwargs))
+
+    async def set_zone(self, zone_id: int, zone_update: ZoneUpdate) -> dict:
+        return await self._client.patch(f'zones/{zone_id}', zone_update.model_dump_json(**json_ser_kwargs))
+
+    async def set_group(self, group_id, update: GroupUpdate) -> dict:
+        return await self._client.patch(f'groups/{group_id}', update.model_dump_json(**json_ser_kwargs))
+
+    async def play_stream(self, stream_id: int) -> dict:
+        return await self._client.post(f'streams/{stream_id}/play')
+
+    async def pause_stream(self, stream_id: int) -> dict:
+        return await self._client.post(f'streams/{stream_id}/pause')
+
+    async def previous_stream(self, stream_id: int) -> dict:
+        return await self._client.post(f'streams/{stream_id}/prev')
+
+    async def next_stream(self, stream_id: int) -> dict:
+        return await self._client.post(f'streams/{stream_id}/next')
+
+    async def stop_stream(self, stream_id: int) -> dict:
+        return await self._client.post(f'streams/{stream_id}/stop')
+
+    def _inflight_done(self, future: asyncio.Future):
+        if self._inflight is future:
+            self._inflight = None
+        if not future.cancelled() and future.exception() is not None:
+            _LOGGER.debug("AmpliPi status read failed: %s", future.exception())
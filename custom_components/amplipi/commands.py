@@ -0,0 +1,134 @@
+"""Command buffering and batching for AmpliPi entities."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from pyamplipi.amplipi import AmpliPi
+from pyamplipi.models import ZoneUpdate, MultiZoneUpdate
+
+
+def _clamp_volume(volume: float) -> float:
+    return round(min(1.0, max(0.0, volume)), 4)
+
+
+class ZoneUpdateBuffer:
+    """Collapses pending zone updates for one zone, group or source into the newest values.
+
+    At most one write is in flight per buffer. Updates arriving while it runs
+    are merged field by field, newest value wins, and sent as a single
+    trailing write. Relative volume steps accumulate into one net delta that
+    is applied to the volume current when the write goes out. Every caller
+    returns once the write carrying its value, or a newer one, has completed.
+    """
+
+    def __init__(self, send: Callable[[ZoneUpdate], Awaitable[None]],
+                 current_volume: Callable[[], Optional[float]]):
+        self._send = send
+        self._current_volume = current_volume
+        self._pending: dict[str, Any] = {}
+        self._pending_delta = 0.0
+        self._flush_task: asyncio.Future | None = None
+
+    async def async_update(self, **fields):
+        """Queue the given ZoneUpdate fields and wait for them to be written."""
+        if 'vol_f' in fields:
+            self._pending_delta = 0.0
+        self._pending.update(fields)
+        await self._async_flush()
+
+    async def async_step(self, delta: float):
+        """Queue a relative volume change and wait for it to be written."""
+        if 'vol_f' in self._pending:
+            self._pending['vol_f'] = _clamp_volume(self._pending['vol_f'] + delta)
+        else:
+            self._pending_delta += delta
+        await self._async_flush()
+
+    async def _async_flush(self):
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush())
+        await asyncio.shield(self._flush_task)
+
+    async def _flush(self):
+        try:
+            while self._pending or self._pending_delta:
+                fields = self._pending
+                if self._pending_delta:
+                    volume = self._current_volume()
+                    if volume is not None:
+                        fields['vol_f'] = _clamp_volume(volume + self._pending_delta)
+                self._pending = {}
+                self._pending_delta = 0.0
+                if fields:
+                    await self._send(ZoneUpdate(**fields))
+        except Exception:
+            self._pending = {}
+            self._pending_delta = 0.0
+            raise
+        finally:
+            self._flush_task = None
+
+
+class _ZoneUpdateBatch:
+    """The zones and groups collected for one ZoneUpdate payload."""
+
+    def __init__(self, update: ZoneUpdate, future: asyncio.Future):
+        self.update = update
+        self.future = future
+        self.zones: set[int] = set()
+        self.groups: set[int] = set()
+
+
+class ZoneUpdateBatcher:
+    """Merges identical zone updates from many entities into one MultiZoneUpdate per window.
+
+    Updates with the same ZoneUpdate payload that arrive within ``window``
+    seconds of the first one are sent as a single ``set_zones`` call covering
+    all of their zones and groups. Distinct payloads go out concurrently and
+    every caller receives the status returned by the call carrying its update.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: AmpliPi, window: float):
+        self._hass = hass
+        self._client = client
+        self._window = window
+        self._batches: dict[str, _ZoneUpdateBatch] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def async_update(self, update: ZoneUpdate, zones: Optional[Iterable[int]] = None,
+                           groups: Optional[Iterable[int]] = None) -> dict:
+        """Queue an update for the given zones and groups and wait for the batch carrying it."""
+        key = update.model_dump_json(exclude_none=True)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _ZoneUpdateBatch(update, self._hass.loop.create_future())
+        batch.zones.update(zones or [])
+        batch.groups.update(groups or [])
+
+        if self._timer is None:
+            self._timer = self._hass.loop.call_later(self._window, self._flush)
+
+        return await asyncio.shield(batch.future)
+
+    @callback
+    def _flush(self):
+        self._timer = None
+        batches, self._batches = self._batches, {}
+        for batch in batches.values():
+            self._hass.async_create_task(self._send(batch))
+
+    async def _send(self, batch: _ZoneUpdateBatch):
+        try:
+            status = await self._client.set_zones(
+                MultiZoneUpdate(
+                    zones=sorted(batch.zones) or None,
+                    groups=sorted(batch.groups) or None,
+                    update=batch.update,
+                )
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            batch.future.set_exception(err)
+        else:
+            batch.future.set_result(status)
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from typing import Any
 
 import async_timeout
@@ -16,32 +17,47 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.typing import DiscoveryInfoType
 from pyamplipi.amplipi import AmpliPi
 
-from .const import DOMAIN, CONF_VENDOR, CONF_VERSION, CONF_WEBAPP, CONF_API_PATH
+from .const import DOMAIN, CONF_VENDOR, CONF_VERSION, CONF_WEBAPP, CONF_API_PATH, CONF_VOLUME_STEP, \
+    DEFAULT_VOLUME_STEP, CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS, CONF_MIN_SCAN_INTERVAL, \
+    DEFAULT_MIN_SCAN_INTERVAL, CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL, PROBED_STATUS, PROBE_TIMEOUT, \
+    PROBE_FRESHNESS, CONF_HEDGE_STATUS_READS
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_retrieve_info(hass, host, port):
-    """Validate the user input allows us to connect."""
+    """Validate the user input allows us to connect.
+
+    The status is kept for async_setup_entry, so an entry created right
+    after the probe does not ask the controller again.
+    """
     session: ClientSession = async_get_clientsession(hass)
 
     _LOGGER.info("Attempting to retrieve AmpliPi details")
 
     try:
-        with async_timeout.timeout(5000):
+        async with async_timeout.timeout(PROBE_TIMEOUT):
             client = AmpliPi(
                 f"http://{host}:{port}/api/",
-                10,
+                PROBE_TIMEOUT,
                 session
             )
-            return await client.get_status()
+            status = await client.get_status()
 
     except ClientError as err:
-        _LOGGER.error("Error connecting to AmpliPi Controller: %s ", err, exc_info=True)
-        raise
-    except asyncio.TimeoutError:
+        _LOGGER.error("Error connecting to AmpliPi Controller: %s ", err)
+        raise CannotConnect from err
+    except asyncio.TimeoutError as err:
         _LOGGER.error("Timed out when connecting to AmpliPi Controller")
-        raise
+        raise CannotConnect from err
+
+    now = time.monotonic()
+    probed = hass.data.setdefault(PROBED_STATUS, {})
+    # probes that never became an entry would otherwise pile up
+    for key in [key for key, (probed_at, _) in probed.items() if now - probed_at >= PROBE_FRESHNESS]:
+        del probed[key]
+    probed[(host, port)] = (now, status)
+    return status
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -60,6 +76,11 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._webapp_url: str | None = None
         self._api_path: str | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        return OptionsFlowHandler(config_entry)
+
     @callback
     def _async_get_entry(self):
         return self.async_create_entry(
@@ -203,5 +224,51 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle AmpliPi options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry):
+        """Initialize options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> data_entry_flow.FlowResult:
+        errors = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_SCAN_INTERVAL] > user_input[CONF_MAX_SCAN_INTERVAL]:
+                errors["base"] = "invalid_scan_interval"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = user_input or self._config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_VOLUME_STEP,
+                    default=options.get(CONF_VOLUME_STEP, DEFAULT_VOLUME_STEP),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.01, max=0.25)),
+                vol.Optional(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                vol.Optional(
+                    CONF_MIN_SCAN_INTERVAL,
+                    default=options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=300)),
+                vol.Optional(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Optional(
+                    CONF_HEDGE_STATUS_READS,
+                    default=options.get(CONF_HEDGE_STATUS_READS, False),
+                ): bool,
+            }
+        )
+
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
+
+
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
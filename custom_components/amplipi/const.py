@@ -1,8 +1,85 @@
 """Constants for the AmpliPi integration."""
+from datetime import timedelta
 
 DOMAIN = "amplipi"
 CONF_VENDOR = "vendor"
 CONF_VERSION = "version"
 AMPLIPI_OBJECT = "amplipi_object"
+COORDINATOR = "coordinator"
+ARTWORK = "artwork"
 CONF_WEBAPP = "webapp"
 CONF_API_PATH = "api_path"
+CONF_VOLUME_STEP = "volume_step"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_HEDGE_STATUS_READS = "hedge_status_reads"
+
+SERVICE_BULK_UPDATE = "bulk_update"
+
+# hass.data key holding the status fetched by the config flow, keyed by (host, port)
+PROBED_STATUS = f"{DOMAIN}_probed_status"
+# seconds the config flow waits for a controller to answer
+PROBE_TIMEOUT = 5
+# seconds a status fetched by the config flow may seed the entry set up right after it
+PROBE_FRESHNESS = 60
+
+DEFAULT_SCAN_INTERVAL = timedelta(seconds=10)
+DEFAULT_VOLUME_STEP = 0.01
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+# bounds in seconds for the adaptive polling interval, the former fixed interval while playing and backing off while idle
+DEFAULT_MIN_SCAN_INTERVAL = 10
+DEFAULT_MAX_SCAN_INTERVAL = 60
+# seconds after a command during which polling stays at the short interval
+ACTIVITY_WINDOW = 30
+# seconds after a burst of commands before the optimistic state is checked against the controller
+RECONCILE_DELAY = 1.0
+# consecutive failed status reads before a controller is treated as unreachable
+BREAKER_THRESHOLD = 3
+# upper bound in seconds for the delay between probes of an unreachable controller
+BREAKER_BACKOFF_MAX = 300
+# seconds identical zone updates from different entities are collected into one request
+BATCH_WINDOW = 0.01
+
+# each controller gets its own connection pool, sized for the request limit plus the event stream;
+# album art is fetched through Home Assistant's shared session
+CONNECTION_POOL_EXTRA = 1
+# seconds idle connections to a controller are kept open between requests
+CONNECTION_KEEPALIVE = 15
+# seconds resolved controller addresses are cached
+DNS_CACHE_TTL = 300
+# seconds to open a connection, and to wait for a status read or a command write to be answered
+CONNECT_TIMEOUT = 3
+STATUS_READ_TIMEOUT = 10
+COMMAND_TIMEOUT = 5
+
+# a status read slower than this percentile of recent reads is duplicated when hedging is enabled
+HEDGE_PERCENTILE = 95
+# at most this share of status reads may be duplicated
+HEDGE_MAX_RATIO = 0.05
+# seconds a read always gets before it is duplicated
+HEDGE_MIN_DELAY = 0.25
+# reads measured before hedging starts
+HEDGE_MIN_SAMPLES = 20
+
+# zones a partial refresh reads one by one before it reads the zone list instead
+ZONE_FETCH_LIMIT = 2
+# requests a partial refresh may take before a single full status read is cheaper
+PARTIAL_FETCH_LIMIT = 2
+
+# seconds a fetched status may be reused by other readers before asking the controller again
+STATUS_FRESHNESS = 0.5
+
+# the last status received from each controller is kept so entities can start before it answers
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 30
+
+# byte limits for the album art cache kept in memory and on disk
+ARTWORK_MEMORY_SIZE = 8 * 1024 * 1024
+ARTWORK_DISK_SIZE = 64 * 1024 * 1024
+
+# event stream served by the controller, relative to the api endpoint
+PUSH_PATH = "events"
+PUSH_BACKOFF_MIN = 1
+PUSH_BACKOFF_MAX = 300
+PUSH_READ_TIMEOUT = 120
@@ -0,0 +1,334 @@
+"""Status coordinator for the AmpliPi integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from typing import Any, Awaitable, Iterable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from pyamplipi.amplipi import AmpliPi
+from pyamplipi.models import Status
+
+from .commands import ZoneUpdateBatcher
+from .const import DOMAIN, DEFAULT_SCAN_INTERVAL, RECONCILE_DELAY, BATCH_WINDOW, ACTIVITY_WINDOW, STORAGE_SAVE_DELAY, \
+    BREAKER_THRESHOLD, BREAKER_BACKOFF_MAX, ZONE_FETCH_LIMIT, PARTIAL_FETCH_LIMIT
+from .snapshot import AmpliPiSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# a pushed document carrying all of these replaces the status instead of being merged into it
+_FULL_STATUS_KEYS = frozenset(('sources', 'zones', 'groups', 'streams'))
+
+
+class AmpliPiDataUpdateCoordinator(DataUpdateCoordinator[AmpliPiSnapshot]):
+    """Fetches the controller status once per cycle and shares it with every entity.
+
+    The polling interval adapts to activity: it stays at ``min_interval``
+    while any source is playing or shortly after a command, and doubles on
+    every idle refresh up to ``max_interval``.
+
+    Every status received from the controller is saved to ``store`` so the
+    next start can publish it before the controller has answered.
+
+    Status reads also drive a circuit breaker. Once the controller has
+    answered, isolated failures keep the last status published. After
+    ``BREAKER_THRESHOLD`` consecutive failures the breaker opens: every entity
+    goes unavailable at once, commands fail immediately instead of waiting
+    out the client timeout, and the controller is probed with exponential
+    backoff. The first successful read closes the breaker and brings
+    everything back together.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: AmpliPi, name: str,
+                 min_interval: timedelta = DEFAULT_SCAN_INTERVAL, max_interval: timedelta = DEFAULT_SCAN_INTERVAL,
+                 store: Store | None = None):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} {name}",
+            update_interval=min_interval,
+        )
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self._last_command = 0.0
+        self._store = store
+        # the newest status the controller itself reported, published again when a command fails
+        self._confirmed: AmpliPiSnapshot | None = None
+        self.breaker_open = False
+        self._failures = 0
+        # a restored status earns no grace period until the controller has answered at least once
+        self._answered = False
+        self._indexed: AmpliPiSnapshot | None = None
+        self.client = client
+        self.batcher = ZoneUpdateBatcher(hass, client, BATCH_WINDOW)
+        # entity state writes skipped because their slice of the status was unchanged
+        self.suppressed_writes = 0
+        self.push_connected = False
+        # background refreshes skipped because user commands were pending
+        self.skipped_refreshes = 0
+        # refreshes served by the smaller zone, group and source endpoints instead of the full status
+        self.partial_fetches = 0
+        self._commands_in_flight = 0
+        self._reconciling = False
+        self._reconcile = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=RECONCILE_DELAY,
+            immediate=False,
+            function=self._async_reconcile,
+        )
+
+    async def _async_update_data(self) -> AmpliPiSnapshot:
+        """Retrieve the full controller status and index it."""
+        if self.data is not None and not self._reconciling and \
+                (self._commands_in_flight or self.client.scheduler.interactive_pending):
+            # the pending commands answer with the status anyway, so skip this background read
+            # unless it is reconciling after a command that did not
+            self.skipped_refreshes += 1
+            return self.data
+
+        started = time.monotonic()
+        try:
+            document = await self.client.get_status_document()
+        except Exception as err:
+            return self._handle_failure(err)
+
+        self._handle_success()
+        if self._last_command >= started:
+            # a command started while the status was being read, so it predates the command
+            # and would overwrite its optimistic state; the command reports the status itself
+            self.skipped_refreshes += 1
+            return self.data
+
+        # an unchanged status comes back as the same document, so its index can be reused as well
+        if self._indexed is not None and self._indexed.document is document:
+            snapshot = self._indexed
+        else:
+            snapshot = self._indexed = AmpliPiSnapshot(document)
+        self._remember(snapshot)
+        self._adapt_interval(snapshot)
+        return snapshot
+
+    def _handle_failure(self, err: Exception) -> AmpliPiSnapshot:
+        self._failures += 1
+        if self._failures < BREAKER_THRESHOLD and self._confirmed is not None and self._answered:
+            _LOGGER.debug(f"AmpliPi status read failed ({self._failures}/{BREAKER_THRESHOLD}): {err}")
+            if not self.push_connected:
+                self.update_interval = self.min_interval
+            # the status the controller last reported, not an optimistic state it never confirmed
+            return self._confirmed
+
+        if not self.breaker_open:
+            self.breaker_open = True
+            _LOGGER.warning(f"{self.name} is unreachable, backing off until it answers again")
+        if not self.push_connected:
+            backoff = self.min_interval * 2 ** max(0, self._failures - BREAKER_THRESHOLD)
+            self.update_interval = min(backoff, max(self.max_interval, timedelta(seconds=BREAKER_BACKOFF_MAX)))
+        raise UpdateFailed(f"Could not retrieve AmpliPi status: {err}") from err
+
+    def _handle_success(self):
+        if self.breaker_open:
+            _LOGGER.info(f"{self.name} is reachable again")
+        self.breaker_open = False
+        self._failures = 0
+        self._answered = True
+
+    async def async_restore(self) -> bool:
+        """Publish the status saved by the previous run, if there is one."""
+        if self._store is None:
+            return False
+        try:
+            stored = await self._store.async_load()
+            if stored is None:
+                return False
+            snapshot = AmpliPiSnapshot(stored)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning(f"Ignoring stored AmpliPi status: {err}")
+            return False
+        self._confirmed = snapshot
+        self.data = snapshot
+        return True
+
+    @callback
+    def async_seed(self, status: Status):
+        """Publish a status fetched from the controller outside the coordinator."""
+        snapshot = AmpliPiSnapshot.from_status(status)
+        self._handle_success()
+        self._remember(snapshot)
+        self.data = snapshot
+
+    def _remember(self, snapshot: AmpliPiSnapshot):
+        """Keep a status confirmed by the controller and schedule saving it."""
+        if snapshot is self._confirmed:
+            return
+        self._confirmed = snapshot
+        if self._store is not None:
+            self._store.async_delay_save(self._stored_status, STORAGE_SAVE_DELAY)
+
+    def _stored_status(self) -> dict[str, Any]:
+        return self._confirmed.document
+
+    @callback
+    def async_set_updated_data(self, data: AmpliPiSnapshot) -> None:
+        """Publish a snapshot and reschedule polling for the activity it shows."""
+        self._adapt_interval(data)
+        super().async_set_updated_data(data)
+
+    def _adapt_interval(self, snapshot: AmpliPiSnapshot):
+        if self.push_connected:
+            return
+        if self._is_active(snapshot):
+            self.update_interval = self.min_interval
+        else:
+            self.update_interval = min(self.max_interval, (self.update_interval or self.min_interval) * 2)
+
+    def _is_active(self, snapshot: AmpliPiSnapshot) -> bool:
+        if self._commands_in_flight or time.monotonic() - self._last_command < ACTIVITY_WINDOW:
+            return True
+        return any(
+            source.info is not None and source.info.state == 'playing'
+            for source in snapshot.sources.values()
+        )
+
+    async def async_shutdown(self) -> None:
+        """Cancel any pending reconciliation and stop refreshing."""
+        await super().async_shutdown()
+        await self._reconcile.async_shutdown()
+
+    async def async_fetch(self, zones: Iterable[int] = (), groups: bool = False,
+                          sources: bool = False) -> AmpliPiSnapshot:
+        """Refresh only the parts of the status a caller needs and merge them into the shared snapshot.
+
+        A full refresh runs instead when there is no snapshot to merge into yet
+        or when the partial reads would take more requests than one full read.
+        """
+        if self.breaker_open:
+            raise HomeAssistantError(f"{self.name} is unreachable")
+
+        paths = _plan_fetch(sorted(set(zones)), groups, sources) if self.data is not None else None
+        if paths is None:
+            await self.async_refresh()
+            return self.data
+        if not paths:
+            return self.data
+
+        try:
+            documents = await asyncio.gather(*(self.client.get_document(path) for path in paths))
+        except Exception as err:
+            raise HomeAssistantError(f"Could not retrieve AmpliPi status: {err}") from err
+
+        fetched_zones = []
+        fetched = {}
+        for path, document in zip(paths, documents):
+            if path.startswith('zones/'):
+                fetched_zones.append(document)
+            elif path == 'zones':
+                fetched_zones.extend(document['zones'])
+            else:
+                fetched[path] = document[path]
+
+        self.partial_fetches += 1
+        snapshot = self.data.with_partial(fetched_zones, fetched.get('groups'), fetched.get('sources'))
+        self.async_set_updated_data(snapshot)
+        return snapshot
+
+    @callback
+    def async_set_optimistic(self, snapshot: AmpliPiSnapshot):
+        """Publish the state a command is expected to produce before the controller confirms it."""
+        # status reads already under way predate the command and must not replace this state
+        self._last_command = time.monotonic()
+        self.async_set_updated_data(snapshot)
+
+    async def async_command(self, command: Awaitable[dict | None], optimistic: AmpliPiSnapshot | None = None):
+        """Send a command, publishing its expected result right away.
+
+        The controller answers writes with the full updated status, which
+        replaces the optimistic state as soon as the last command of a burst
+        returns. Only when a write fails or answers without a status does a
+        reconciliation fetch run, once the burst has settled. A failed write
+        also publishes the last status the controller reported again.
+        """
+        if self.breaker_open:
+            if hasattr(command, 'close'):
+                command.close()
+            raise HomeAssistantError(f"{self.name} is unreachable")
+
+        if optimistic is not None:
+            self.async_set_optimistic(optimistic)
+
+        status = None
+        failed = True
+        self._last_command = time.monotonic()
+        self._commands_in_flight += 1
+        try:
+            status = await command
+            failed = False
+        finally:
+            self._commands_in_flight -= 1
+            if not _is_full_status(status):
+                if failed and not self._commands_in_flight and self._confirmed is not None:
+                    # the controller never applied the optimistic state, go back to what it last reported
+                    self.async_set_updated_data(self._confirmed)
+                await self._reconcile.async_call()
+            else:
+                self._handle_success()
+                snapshot = AmpliPiSnapshot(status)
+                self._remember(snapshot)
+                if not self._commands_in_flight:
+                    self.async_set_updated_data(snapshot)
+
+    async def _async_reconcile(self):
+        if self._commands_in_flight:
+            # the last command to finish schedules another reconciliation
+            return
+        self._reconciling = True
+        try:
+            await self.async_refresh()
+        finally:
+            self._reconciling = False
+
+    @callback
+    def async_apply_push(self, payload: dict[str, Any]):
+        """Merge a pushed status document, full or a delta of the changed objects, into the current snapshot."""
+        if self.data is None or _FULL_STATUS_KEYS <= payload.keys():
+            snapshot = AmpliPiSnapshot(payload)
+        else:
+            snapshot = self.data.with_changes(payload)
+        self._handle_success()
+        self._remember(snapshot)
+        self.async_set_updated_data(snapshot)
+
+    @callback
+    def async_set_push_connected(self, connected: bool):
+        """Stop polling while a push connection delivers updates and resume it once the connection drops."""
+        self.push_connected = connected
+        if connected:
+            self.update_interval = None
+        else:
+            self.update_interval = self.min_interval
+            self.hass.async_create_task(self.async_request_refresh())
+
+
+def _plan_fetch(zones: list[int], groups: bool, sources: bool) -> Optional[list[str]]:
+    """Choose the endpoints that cover a refresh, or None when the full status is the cheaper read."""
+    if len(zones) > ZONE_FETCH_LIMIT:
+        paths = ['zones']
+    else:
+        paths = [f'zones/{zone_id}' for zone_id in zones]
+    if groups:
+        paths.append('groups')
+    if sources:
+        paths.append('sources')
+    return paths if len(paths) <= PARTIAL_FETCH_LIMIT else None
+
+
+def _is_full_status(status) -> bool:
+    """Whether a write response carries the controller status rather than an empty body."""
+    return isinstance(status, dict) and bool(status.get('zones') or status.get('sources'))
@@ -0,0 +1,28 @@
+"""Diagnostics support for AmpliPi."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, COORDINATOR
+from .coordinator import AmpliPiDataUpdateCoordinator
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: AmpliPiDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "suppressed_writes": coordinator.suppressed_writes,
+        "push_connected": coordinator.push_connected,
+        "breaker_open": coordinator.breaker_open,
+        "skipped_refreshes": coordinator.skipped_refreshes,
+        "partial_fetches": coordinator.partial_fetches,
+        "scheduler": coordinator.client.scheduler.stats(),
+        "unchanged_status_reads": coordinator.client.unchanged_reads,
+        "connections": coordinator.client.connection_stats.as_dict(),
+        "hedging": coordinator.client.hedger.stats() if coordinator.client.hedger is not None else None,
+    }
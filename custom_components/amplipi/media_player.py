@@ -1,8 +1,7 @@
 """Support for interfacing with the AmpliPi Multizone home audio controller."""
 import logging
 import operator
-from functools import reduce
-from typing import List
+from functools import lru_cache, reduce
 
 import validators
 from homeassistant.components import media_source
@@ -11,13 +10,20 @@ from homeassistant.components.media_player.browse_media import (
     async_process_play_media_url,
 )
 from homeassistant.const import CONF_NAME, STATE_PLAYING, STATE_PAUSED, STATE_IDLE, STATE_UNKNOWN
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from pyamplipi.amplipi import AmpliPi
-from pyamplipi.models import ZoneUpdate, Source, SourceUpdate, GroupUpdate, Stream, Group, Zone, Announcement, \
-    MultiZoneUpdate, PlayMedia
+from pyamplipi.models import ZoneUpdate, SourceUpdate, GroupUpdate, Announcement, MultiZoneUpdate, PlayMedia
 
+from .artwork import AlbumArtCache, artwork_hash
+from .client import interactive_command
+from .commands import ZoneUpdateBuffer
 from .const import (
-    DOMAIN, AMPLIPI_OBJECT, CONF_VENDOR, CONF_VERSION, CONF_WEBAPP, )
+    DOMAIN, AMPLIPI_OBJECT, COORDINATOR, CONF_VENDOR, CONF_VERSION, CONF_WEBAPP, CONF_VOLUME_STEP,
+    DEFAULT_VOLUME_STEP, ARTWORK, )
+from .coordinator import AmpliPiDataUpdateCoordinator
+from .snapshot import AmpliPiSnapshot, SourceRecord, ZoneRecord, GroupRecord
 
 SUPPORT_AMPLIPI_DAC = (
         MediaPlayerEntityFeature.SELECT_SOURCE
@@ -47,9 +53,12 @@ SUPPORT_LOOKUP_DICT = {
 
 _LOGGER = logging.getLogger(__name__)
 
-PARALLEL_UPDATES = 1
+# concurrency is bounded per controller by the client's request scheduler instead
+PARALLEL_UPDATES = 0
 
 
+# entities resolve the same few album art urls on every update, so validate each pair only once
+@lru_cache(maxsize=256)
 def build_url(api_base_path, img_url):
     if img_url is None:
         return None
@@ -67,30 +76,49 @@ def build_url(api_base_path, img_url):
     return None
 
 
+def _published_state(entity: MediaPlayerEntity) -> tuple:
+    """Return everything async_write_ha_state would publish for an entity, to tell whether a write is needed."""
+    if not entity.available:
+        return (False,)
+    return (
+        True,
+        entity.name,
+        entity.state,
+        entity.supported_features,
+        entity.entity_picture,
+        entity.capability_attributes,
+        entity.state_attributes,
+        entity.extra_state_attributes,
+    )
+
+
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the AmpliPi MultiZone Audio Controller"""
 
     hass_entry = hass.data[DOMAIN][config_entry.entry_id]
 
     amplipi: AmpliPi = hass_entry[AMPLIPI_OBJECT]
+    coordinator: AmpliPiDataUpdateCoordinator = hass_entry[COORDINATOR]
     vendor = hass_entry[CONF_VENDOR]
     name = hass_entry[CONF_NAME]
     version = hass_entry[CONF_VERSION]
     image_base_path = f'{hass_entry[CONF_WEBAPP]}'
+    volume_step = config_entry.options.get(CONF_VOLUME_STEP, DEFAULT_VOLUME_STEP)
 
-    status = await amplipi.get_status()
+    artwork = hass_entry[ARTWORK]
+    snapshot = coordinator.data
 
     sources: list[MediaPlayerEntity] = [
-        AmpliPiSource(DOMAIN, source, status.streams, vendor, version, image_base_path, amplipi)
-        for source in status.sources]
+        AmpliPiSource(DOMAIN, source, vendor, version, image_base_path, amplipi, coordinator, volume_step, artwork)
+        for source in snapshot.sources.values()]
 
     zones: list[MediaPlayerEntity] = [
-        AmpliPiZone(DOMAIN, zone, None, status.streams, status.sources, vendor, version, image_base_path, amplipi)
-        for zone in status.zones]
+        AmpliPiZone(DOMAIN, zone, None, vendor, version, image_base_path, amplipi, coordinator, volume_step, artwork)
+        for zone in snapshot.zones.values()]
 
     groups: list[MediaPlayerEntity] = [
-        AmpliPiZone(DOMAIN, None, group, status.streams, status.sources, vendor, version, image_base_path, amplipi)
-        for group in status.groups]
+        AmpliPiZone(DOMAIN, None, group, vendor, version, image_base_path, amplipi, coordinator, volume_step, artwork)
+        for group in snapshot.groups.values()]
     
     announcer: list[MediaPlayerEntity] = [
         AmpliPiAnnouncer(DOMAIN, vendor, version, image_base_path, amplipi)
@@ -103,22 +131,26 @@ async def async_remove_entry(hass, entry) -> None:
     pass
 
 
-class AmpliPiSource(MediaPlayerEntity):
+class AmpliPiSource(CoordinatorEntity[AmpliPiDataUpdateCoordinator], MediaPlayerEntity):
     """Representation of an AmpliPi Source Input, of which 4 are supported (Hard Coded)."""
 
-    @property
-    def should_poll(self):
-        """Polling needed."""
-        return True
-
-    def __init__(self, namespace: str, source: Source, streams: List[Stream], vendor: str, version: str,
-                 image_base_path: str, client: AmpliPi):
-        self._streams = streams
+    def __init__(self, namespace: str, source: SourceRecord, vendor: str, version: str,
+                 image_base_path: str, client: AmpliPi, coordinator: AmpliPiDataUpdateCoordinator,
+                 volume_step: float = DEFAULT_VOLUME_STEP, artwork: AlbumArtCache | None = None):
+        super().__init__(coordinator)
+        self._artwork = artwork
+        self._volume_step = volume_step
+        self._streams = {}
+        self._snapshot: AmpliPiSnapshot | None = None
         self._id = source.id
         self._current_stream = None
         self._image_base_path = image_base_path
         self._zones = []
         self._groups = []
+        self._volume_member = None
+        self._mute_member = None
+        self._published_slice = None
+        self._zone_update_buffer = ZoneUpdateBuffer(self._send_zone_update, self._current_volume)
         self._name = f"Source {self._id + 1}"
         self._vendor = vendor
         self._version = version
@@ -127,6 +159,7 @@ class AmpliPiSource(MediaPlayerEntity):
         self._unique_id = f"{namespace}_source_{source.id}"
         self._last_update_successful = False
         self._attr_device_class = MediaPlayerDeviceClass.SPEAKER
+        self._sync_from_status(coordinator.data)
 
 
     async def async_turn_off(self):
@@ -136,43 +169,23 @@ class AmpliPiSource(MediaPlayerEntity):
                 input='None'
             ))
 
+    @interactive_command
     async def async_mute_volume(self, mute):
         if mute is None:
             return
 
         if self._source is not None:
             _LOGGER.warning(f"setting mute to {mute}")
-            await self._update_zones(
-                MultiZoneUpdate(
-                    zones=[z.id for z in self._zones],
-                    groups=[z.id for z in self._groups],
-                    update=ZoneUpdate(
-                        mute=mute,
-                    )
-                )
-            )
+            await self._zone_update_buffer.async_update(mute=mute)
 
+    @interactive_command
     async def async_set_volume_level(self, volume):
         if volume is None:
             return
         _LOGGER.warning(f"setting volume to {volume}")
-        
-        group = next(filter(lambda z: z.vol_f is not None, self._groups), None)
-        zone = next(filter(lambda z: z.vol_f is not None, self._zones), None)
-        if group is not None:
-            group.vol_f = volume
-        elif zone is not None:
-            zone.vol_f = volume
-        
-        await self._update_zones(
-            MultiZoneUpdate(
-                zones=[z.id for z in self._zones],
-                groups=[z.id for z in self._groups],
-                update=ZoneUpdate(
-                    vol_f=volume
-                )
-            )
-        )
+
+        self.coordinator.async_set_optimistic(self._with_zone_update(ZoneUpdate(vol_f=volume)))
+        await self._zone_update_buffer.async_update(vol_f=volume)
 
 
     async def async_volume_up(self):
@@ -180,16 +193,16 @@ class AmpliPiSource(MediaPlayerEntity):
             await self.hass.async_add_executor_job(self.volume_up)
             return
 
-        if self.volume_level is not None and self.volume_level < 1:
-            await self.async_set_volume_level(min(1, self.volume_level + 0.01))
+        if self._current_volume() is not None:
+            await self._zone_update_buffer.async_step(self._volume_step)
 
     async def async_volume_down(self):
         if hasattr(self, "volume_down"):
             await self.hass.async_add_executor_job(self.volume_down)
             return
 
-        if self.volume_level is not None and self.volume_level > 0:
-            await self.async_set_volume_level(max(0, self.volume_level - 0.01))
+        if self._current_volume() is not None:
+            await self._zone_update_buffer.async_step(-self._volume_step)
 
 
     async def async_browse_media(self, media_content_type=None, media_content_id=None):
@@ -201,24 +214,28 @@ class AmpliPiSource(MediaPlayerEntity):
         )
 
     async def async_media_play(self):
-        await self._client.play_stream(self._current_stream.id)
-        await self.async_update()
+        await self.coordinator.async_command(
+            self._client.play_stream(self._current_stream.id),
+            self.coordinator.data.with_stream_state(self._current_stream.id, 'playing'),
+        )
 
     async def async_media_stop(self):
-        await self._client.stop_stream(self._current_stream.id)
-        await self.async_update()
+        await self.coordinator.async_command(
+            self._client.stop_stream(self._current_stream.id),
+            self.coordinator.data.with_stream_state(self._current_stream.id, 'stopped'),
+        )
 
     async def async_media_pause(self):
-        await self._client.pause_stream(self._current_stream.id)
-        await self.async_update()
+        await self.coordinator.async_command(
+            self._client.pause_stream(self._current_stream.id),
+            self.coordinator.data.with_stream_state(self._current_stream.id, 'paused'),
+        )
 
     async def async_media_previous_track(self):
-        await self._client.previous_stream(self._current_stream.id)
-        await self.async_update()
+        await self.coordinator.async_command(self._client.previous_stream(self._current_stream.id))
 
     async def async_media_next_track(self):
-        await self._client.next_stream(self._current_stream.id)
-        await self.async_update()
+        await self.coordinator.async_command(self._client.next_stream(self._current_stream.id))
 
     async def async_join_players(self, group_members):
         """Join `group_members` as a player group with the current player."""
@@ -226,6 +243,7 @@ class AmpliPiSource(MediaPlayerEntity):
     async def async_unjoin_player(self):
         """Remove this player from any group."""
 
+    @interactive_command
     async def async_play_media(self, media_type, media_id, **kwargs):
         _LOGGER.warning(f'Play Media {media_type} {media_id} {kwargs}')
 
@@ -243,6 +261,7 @@ class AmpliPiSource(MediaPlayerEntity):
         )
         pass
 
+    @interactive_command
     async def async_select_source(self, source):
 
         if self._source is not None and self._source.name == source:
@@ -254,10 +273,10 @@ class AmpliPiSource(MediaPlayerEntity):
                 input='None'
             ))
         else:
-            stream = next(filter(lambda z: z.name == source, self._streams), None)
+            stream = self._snapshot.streams_by_name.get(source) if self._snapshot is not None else None
             if stream is None:
                 _LOGGER.warning(f'Select Source {source} called but a match could not be found in the stream cache, '
-                                f'{self._streams}')
+                                f'{list(self._streams.values())}')
                 pass
             else:
                 await self._update_source(SourceUpdate(
@@ -273,22 +292,6 @@ class AmpliPiSource(MediaPlayerEntity):
     def set_repeat(self, repeat):
         pass
 
-    def build_url(self, img_url):
-        if img_url is None:
-            return None
-
-        # if we have a full url, go ahead and return it
-        if validators.url(img_url):
-            return img_url
-
-        # otherwise it might be a relative path.
-        new_url = f'{self._image_base_path}/{img_url}'
-
-        if validators.url(new_url):
-            return new_url
-
-        return None
-
     @property
     def supported_features(self):
         """Return flag of media commands that are supported."""
@@ -350,40 +353,42 @@ class AmpliPiSource(MediaPlayerEntity):
         """Return the name of the zone."""
         return "AmpliPi: " + self._name
 
-    async def async_update(self):
-        """Retrieve latest state."""
-        _LOGGER.info(f'Retrieving state for source {self._source.id}')
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Sync this source from the coordinator's latest status, writing state only if it changed."""
+        self._sync_from_status(self.coordinator.data)
+        state_slice = _published_state(self)
+        if state_slice == self._published_slice:
+            self.coordinator.suppressed_writes += 1
+            return
+        self._published_slice = state_slice
+        self.async_write_ha_state()
 
-        try:
-            state = await self._client.get_status()
-            source = next(filter(lambda z: z.id == self._source.id, state.sources), None)
-            streams = state.streams
-        except Exception:
+    def _sync_from_status(self, snapshot: AmpliPiSnapshot):
+        if not self.coordinator.last_update_success or snapshot is None:
             self._last_update_successful = False
-            _LOGGER.error(f'Could not update source {self._source.id}')
             return
 
+        source = snapshot.sources.get(self._id)
+
         if not source:
             self._last_update_successful = False
             return
 
-        groups = list(filter(lambda z: z.source_id == self._source.id, state.groups))
-        zones = list(filter(lambda z: z.source_id == self._source.id, state.zones))
-
-        self.sync_state(source, streams, zones, groups)
+        self.sync_state(source, snapshot)
 
-    def sync_state(self, state: Source, streams: List[Stream], zones: List[Zone], groups: List[Group]):
+    def sync_state(self, state: SourceRecord, snapshot: AmpliPiSnapshot):
         self._source = state
-        self._streams = streams
-
-        self._current_stream = None
-
-        if 'stream=' in state.input and 'stream=local' not in state.input:
-            stream_id = int(self._source.input.split('=')[1])
-            self._current_stream = next(filter(lambda z: z.id == stream_id, self._streams), None)
-
-        self._zones = zones
-        self._groups = groups
+        self._snapshot = snapshot
+        self._streams = snapshot.streams
+        self._current_stream = snapshot.stream_for_source(state.id)
+
+        self._zones = snapshot.source_zones.get(state.id, [])
+        self._groups = snapshot.source_groups.get(state.id, [])
+        self._volume_member = next((g for g in self._groups if g.vol_f is not None), None) or \
+            next((z for z in self._zones if z.vol_f is not None), None)
+        self._mute_member = next((g for g in self._groups if g.mute is not None), None) or \
+            next((z for z in self._zones if z.mute is not None), None)
         self._last_update_successful = True
         self._name = state.name
 
@@ -403,6 +408,8 @@ class AmpliPiSource(MediaPlayerEntity):
             else:
                 self._attr_app_name = None
             self._attr_media_image_url = build_url(self._image_base_path, info.img_url)
+            self._attr_media_image_hash = artwork_hash(
+                self._attr_media_image_url, info.artist, info.album, info.track, info.station)
             self._attr_media_channel = info.station
         else:
             self._attr_media_album_artist = None
@@ -411,8 +418,15 @@ class AmpliPiSource(MediaPlayerEntity):
             self._attr_media_track = None
             self._attr_app_name = None
             self._attr_media_image_url = None
+            self._attr_media_image_hash = None
             self._attr_media_channel = None
 
+    async def async_get_media_image(self):
+        """Fetch the current album art through the local cache."""
+        if self._artwork is None or self.media_image_url is None:
+            return await super().async_get_media_image()
+        return await self._artwork.async_get(self.media_image_url, self.media_image_hash)
+
     @property
     def state(self):
         """Return the state of the zone."""
@@ -442,24 +456,15 @@ class AmpliPiSource(MediaPlayerEntity):
     @property
     def volume_level(self):
         """Volume level of the media player (0..1)."""
-        # if self._source.vol_delta is None:
-        group = next(filter(lambda z: z.vol_f is not None, self._groups), None)
-        zone = next(filter(lambda z: z.vol_f is not None, self._zones), None)
-        if group is not None:
-            return group.vol_f
-        elif zone is not None:
-            return zone.vol_f
+        if self._volume_member is not None:
+            return self._volume_member.vol_f
         return STATE_UNKNOWN
 
     @property
     def is_volume_muted(self) -> bool:
         """Boolean if volume is currently muted."""
-        group = next(filter(lambda z: z.mute is not None, self._groups), None)
-        zone = next(filter(lambda z: z.mute is not None, self._zones), None)
-        if group is not None:
-            return group.mute
-        elif zone is not None:
-            return zone.mute
+        if self._mute_member is not None:
+            return self._mute_member.mute
         return STATE_UNKNOWN
 
     @property
@@ -475,25 +480,48 @@ class AmpliPiSource(MediaPlayerEntity):
     def source_list(self):
         """List of available input sources."""
         streams = ['None']
-        streams += [stream.name for stream in self._streams if stream.id >= 1000 or stream.id - 996 == self._id]
+        streams += [stream.name for stream in self._streams.values() if stream.id >= 1000 or stream.id - 996 == self._id]
         return streams
 
+    def _with_zone_update(self, update: ZoneUpdate):
+        return self.coordinator.data.with_zone_update(
+            update,
+            zones=[z.id for z in self._zones],
+            groups=[g.id for g in self._groups],
+        )
+
     async def _update_source(self, update: SourceUpdate):
-        await self._client.set_source(self._source.id, update)
-        await self.async_update()
+        await self.coordinator.async_command(
+            self._client.set_source(self._source.id, update),
+            self.coordinator.data.with_source_update(self._source.id, update),
+        )
+
+    def _current_volume(self):
+        if self._volume_member is not None:
+            return self._volume_member.vol_f
+        return None
+
+    async def _send_zone_update(self, update: ZoneUpdate):
+        await self._update_zones(
+            MultiZoneUpdate(
+                zones=[z.id for z in self._zones],
+                groups=[z.id for z in self._groups],
+                update=update,
+            )
+        )
 
     async def _update_zones(self, update: MultiZoneUpdate):
         # zones = await self._client.get_zones()
         # associated_zones = filter(lambda z: z.source_id == self._source.id, zones)
-        await self._client.set_zones(update)
-        await self.async_update()
+        await self.coordinator.async_command(
+            self.coordinator.batcher.async_update(update.update, zones=update.zones, groups=update.groups),
+            self.coordinator.data.with_zone_update(update.update, zones=update.zones, groups=update.groups),
+        )
 
     async def _update_groups(self, update: GroupUpdate):
-        groups = await self._client.get_groups()
-        associated_groups = filter(lambda g: g.source_id == self._source.id, groups)
-        for group in associated_groups:
-            await self._client.set_group(group.id, update)
-        await self.async_update()
+        snapshot = await self.coordinator.async_fetch(groups=True)
+        for group in snapshot.source_groups.get(self._source.id, []):
+            await self.coordinator.async_command(self._client.set_group(group.id, update))
 
     @property
     def extra_state_attributes(self):
@@ -503,16 +531,11 @@ class AmpliPiSource(MediaPlayerEntity):
         return {"amplipi_source_id" : self._id,
                 "amplipi_source_zones" : zone_list}
 
-class AmpliPiZone(MediaPlayerEntity):
+class AmpliPiZone(CoordinatorEntity[AmpliPiDataUpdateCoordinator], MediaPlayerEntity):
     """Representation of an AmpliPi Zone and/or Group. Supports Audio volume
         and mute controls and the ability to change the current 'source' a
         zone is tied to"""
 
-    @property
-    def should_poll(self):
-        """Polling needed."""
-        return True
-
     async def async_turn_on(self):
         if self._is_group:
             await self._update_group(
@@ -532,11 +555,15 @@ class AmpliPiZone(MediaPlayerEntity):
         #self.is_on = True
 
     def __init__(self, namespace: str, zone, group,
-                 streams: List[Stream], sources: List[Source],
                  vendor: str, version: str, image_base_path: str,
-                 client: AmpliPi):
+                 client: AmpliPi, coordinator: AmpliPiDataUpdateCoordinator,
+                 volume_step: float = DEFAULT_VOLUME_STEP, artwork: AlbumArtCache | None = None):
+        super().__init__(coordinator)
+        self._artwork = artwork
+        self._volume_step = volume_step
         self._current_source = None
-        self._sources = sources
+        self._current_stream = None
+        self._sources = {}
         self._is_group = group is not None
 
         if self._is_group:
@@ -548,7 +575,6 @@ class AmpliPiZone(MediaPlayerEntity):
             self._name = zone.name
             self._unique_id = f"{namespace}_zone_{self._id}"
 
-        self._streams = streams
         self._image_base_path = image_base_path
         self._vendor = vendor
         self._version = version
@@ -565,7 +591,10 @@ class AmpliPiZone(MediaPlayerEntity):
         ]
         self._available = False
         self._extra_attributes = []
+        self._published_slice = None
+        self._zone_update_buffer = ZoneUpdateBuffer(self._send_zone_update, self._current_volume)
         self._attr_device_class = MediaPlayerDeviceClass.SPEAKER
+        self._sync_from_status(coordinator.data)
 
     async def async_turn_off(self):
         if self._current_source is not None:
@@ -585,47 +614,26 @@ class AmpliPiZone(MediaPlayerEntity):
                     source_id=-1,
                 ))
 
+    @interactive_command
     async def async_mute_volume(self, mute):
         if mute is None:
             return
         _LOGGER.info(f"setting mute to {mute}")
-        if self._is_group:
-            await self._update_group(
-                MultiZoneUpdate(
-                    groups=[self._group.id],
-                    update=ZoneUpdate(
-                        mute=mute,
-                    )
-                )
-            )
-        else:
-            await self._update_zone(ZoneUpdate(
-                mute=mute
-            ))
+        await self._zone_update_buffer.async_update(mute=mute)
 
+    @interactive_command
     async def async_set_volume_level(self, volume):
         if volume is None:
             return
         
-        if self._is_group and self._group is not None:
-            self._group.vol_f = volume
-        elif self._zone is not None:
-            self._zone.vol_f = volume
-    
-        _LOGGER.info(f"setting volume to {volume}")
         if self._is_group:
-            await self._update_group(
-                MultiZoneUpdate(
-                    groups=[self._group.id],
-                    update=ZoneUpdate(
-                        vol_f=volume
-                    )
-                )
-            )
+            optimistic = self.coordinator.data.with_zone_update(ZoneUpdate(vol_f=volume), groups=[self._id])
         else:
-            await self._update_zone(ZoneUpdate(
-                vol_f=volume
-            ))
+            optimistic = self.coordinator.data.with_zone_update(ZoneUpdate(vol_f=volume), zones=[self._id])
+        self.coordinator.async_set_optimistic(optimistic)
+
+        _LOGGER.info(f"setting volume to {volume}")
+        await self._zone_update_buffer.async_update(vol_f=volume)
 
 
     async def async_volume_up(self):
@@ -633,16 +641,16 @@ class AmpliPiZone(MediaPlayerEntity):
             await self.hass.async_add_executor_job(self.volume_up)
             return
 
-        if self.volume_level is not None and self.volume_level < 1:
-            await self.async_set_volume_level(min(1, self.volume_level + 0.01))
+        if self._current_volume() is not None:
+            await self._zone_update_buffer.async_step(self._volume_step)
 
     async def async_volume_down(self):
         if hasattr(self, "volume_down"):
             await self.hass.async_add_executor_job(self.volume_down)
             return
 
-        if self.volume_level is not None and self.volume_level > 0:
-            await self.async_set_volume_level(max(0, self.volume_level - 0.01))
+        if self._current_volume() is not None:
+            await self._zone_update_buffer.async_step(-self._volume_step)
 
     @property
     def supported_features(self):
@@ -702,71 +710,73 @@ class AmpliPiZone(MediaPlayerEntity):
         """Return the name of the zone."""
         return "AmpliPi: " + self._name
 
-    async def async_update(self):
-        """Retrieve latest state."""
-        _LOGGER.info(f'Retrieving state for source {self._id}')
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Sync this zone or group from the coordinator's latest status, writing state only if it changed."""
+        self._sync_from_status(self.coordinator.data)
+        state_slice = _published_state(self)
+        if state_slice == self._published_slice:
+            self.coordinator.suppressed_writes += 1
+            return
+        self._published_slice = state_slice
+        self.async_write_ha_state()
 
+    def _sync_from_status(self, snapshot: AmpliPiSnapshot):
+        """Derive availability, extra attributes and media state from a single status snapshot."""
         zone = None
         group = None
-        enabled = False
 
-        try:
-            state = await self._client.get_status()
-            if self._is_group:
-                group = next(filter(lambda z: z.id == self._id, state.groups), None)
-                if not group:
-                    self._last_update_successful = False
-                    return
-                any_enabled_zone = next(filter(lambda z: z.id in group.zones, state.zones), None)
-
-                if any_enabled_zone is not None:
-                    enabled = True
-            else:
-                zone = next(filter(lambda z: z.id == self._id, state.zones), None)
-                if not zone:
-                    self._last_update_successful = False
-                    return
-                enabled = not zone.disabled
-            streams = state.streams
-        except Exception:
+        if not self.coordinator.last_update_success or snapshot is None:
             self._last_update_successful = False
-            _LOGGER.error(f'Could not update source {self._id}')
             return
 
-        await self._get_extra_attributes()
-        self._available = await self._update_available()
-        self.sync_state(zone, group, streams, state.sources, enabled)
+        if self._is_group:
+            group = snapshot.groups.get(self._id)
+            if not group:
+                self._last_update_successful = False
+                return
+
+            member_zones = snapshot.group_zones.get(self._id, [])
+            enabled_zone_ids = [z.id for z in member_zones if not z.disabled]
+
+            enabled = len(member_zones) > 0
+            self._available = len(enabled_zone_ids) > 0
+            self._extra_attributes = {"amplipi_zones": enabled_zone_ids}
+        else:
+            zone = snapshot.zones.get(self._id)
+            if not zone:
+                self._last_update_successful = False
+                return
 
-    def sync_state(self, zone: Zone, group: Group, streams: List[Stream],
-                   sources: List[Source], enabled: bool):
+            enabled = not zone.disabled
+            self._available = enabled
+            self._extra_attributes = {"amplipi_zone_id": zone.id}
+
+        self.sync_state(zone, group, snapshot, enabled)
+
+    def sync_state(self, zone: ZoneRecord, group: GroupRecord, snapshot: AmpliPiSnapshot, enabled: bool):
         self._zone = zone
         self._group = group
-        self._streams = streams
-        self._sources = sources
+        self._sources = snapshot.sources
         self._last_update_successful = True
         self._enabled = enabled
 
         info = None
-        self._current_source = None
-
-        if self._is_group:
-            self._current_source = next(filter(lambda s: self._group.source_id == s.id, sources), None)
-        elif self._zone.source_id is not None:
-            self._current_source = next(filter(lambda s: self._zone.source_id == s.id, sources), None)
+        source_id = self._group.source_id if self._is_group else self._zone.source_id
+        self._current_source = snapshot.sources.get(source_id) if source_id is not None else None
+        self._current_stream = snapshot.stream_for_source(source_id)
 
         if self._current_source is not None:
             info = self._current_source.info
 
-        if self._current_source is not None and 'stream=' in self._current_source.input and 'stream=local' not in self._current_source.input:
-            stream_id = int(self._current_source.input.split('=')[1])
-            self._current_stream = next(filter(lambda z: z.id == stream_id, self._streams), None)
-
         if info is not None:
             self._attr_media_album_artist = info.artist
             self._attr_media_album_name = info.album
             self._attr_media_title = info.name
             self._attr_media_track = info.track
             self._attr_media_image_url = build_url(self._image_base_path, info.img_url)
+            self._attr_media_image_hash = artwork_hash(
+                self._attr_media_image_url, info.artist, info.album, info.track, info.station)
             self._attr_media_channel = info.station
         else:
             self._attr_media_album_artist = None
@@ -774,8 +784,15 @@ class AmpliPiZone(MediaPlayerEntity):
             self._attr_media_title = None
             self._attr_media_track = None
             self._attr_media_image_url = None
+            self._attr_media_image_hash = None
             self._attr_media_channel = None
 
+    async def async_get_media_image(self):
+        """Fetch the current album art through the local cache."""
+        if self._artwork is None or self.media_image_url is None:
+            return await super().async_get_media_image()
+        return await self._artwork.async_get(self.media_image_url, self.media_image_hash)
+
     @property
     def state(self):
         """Return the state of the zone."""
@@ -820,6 +837,7 @@ class AmpliPiZone(MediaPlayerEntity):
         else:
             return self._zone.mute
 
+    @interactive_command
     async def async_select_source(self, source):
         source_id = int(source.split(' ')[1]) - 1
         self._selected_source = source
@@ -838,15 +856,32 @@ class AmpliPiZone(MediaPlayerEntity):
                     source_id=source_id
                 )
             )
-        await self.async_update()
+
+    def _current_volume(self):
+        return self.volume_level
+
+    async def _send_zone_update(self, update: ZoneUpdate):
+        if self._is_group:
+            await self._update_group(
+                MultiZoneUpdate(
+                    groups=[self._id],
+                    update=update,
+                )
+            )
+        else:
+            await self._update_zone(update)
 
     async def _update_zone(self, update: ZoneUpdate):
-        await self._client.set_zone(self._id, update)
-        await self.async_update()
+        await self.coordinator.async_command(
+            self.coordinator.batcher.async_update(update, zones=[self._id]),
+            self.coordinator.data.with_zone_update(update, zones=[self._id]),
+        )
 
     async def _update_group(self, update: MultiZoneUpdate):
-        await self._client.set_zones(update)
-        await self.async_update()
+        await self.coordinator.async_command(
+            self.coordinator.batcher.async_update(update.update, zones=update.zones, groups=update.groups),
+            self.coordinator.data.with_zone_update(update.update, zones=update.zones, groups=update.groups),
+        )
 
     @property
     def entity_registry_enabled_default(self):
@@ -881,6 +916,7 @@ class AmpliPiZone(MediaPlayerEntity):
             content_filter=lambda item: item.media_content_type.startswith("audio/"),
         )
 
+    @interactive_command
     async def async_play_media(self, media_type, media_id, **kwargs):
         _LOGGER.warning(f'Play Media {media_type} {media_id} {kwargs}')
 
@@ -891,8 +927,8 @@ class AmpliPiZone(MediaPlayerEntity):
 
         #No source, see if we can find an empty one
         if self._current_source is None:
-            sources = await self._client.get_sources()
-            for source in sources:
+            snapshot = await self.coordinator.async_fetch(sources=True)
+            for source in snapshot.sources.values():
                 if source is not None and (source.input == '' or source.input == 'None' or source.input is None):
                     self._current_source = source
             
@@ -911,59 +947,35 @@ class AmpliPiZone(MediaPlayerEntity):
 
     @property
     def available(self):
-        return self._available
+        return self._available and self.coordinator.last_update_success
 
     @property
     def extra_state_attributes(self):
         return self._extra_attributes
 
-    async def _get_extra_attributes(self):
-        if self._is_group:
-            state = await self._client.get_status()
-            zone_ids = []
-
-            for zone_id in self._group.zones:
-                for state_zone in state.zones:
-                    if state_zone.id == zone_id and not state_zone.disabled:
-                        zone_ids.append(zone_id)
-            self._extra_attributes = {"amplipi_zones" : zone_ids}
-
-            #if self._zone_num_cache != len(zone_ids):
-                #self.hass.bus.fire("group_change_event", {"group_change": True})
-        else:
-            self._extra_attributes = {"amplipi_zone_id" : self._zone.id}
-
-    async def _update_available(self):
-        state = await self._client.get_status()
-        if self._is_group:
-            for zone_id in self._group.zones:
-                for state_zone in state.zones:
-                    if state_zone.id == zone_id and not state_zone.disabled:
-                        return True
-            return False
-        elif self._zone is None or self._zone.disabled:
-            return False
-        return True
-
     async def async_media_play(self):
-        await self._client.play_stream(self._current_stream.id)
-        await self.async_update()
+        await self.coordinator.async_command(
+            self._client.play_stream(self._current_stream.id),
+            self.coordinator.data.with_stream_state(self._current_stream.id, 'playing'),
+        )
 
     async def async_media_stop(self):
-        await self._client.stop_stream(self._current_stream.id)
-        await self.async_update()
+        await self.coordinator.async_command(
+            self._client.stop_stream(self._current_stream.id),
+            self.coordinator.data.with_stream_state(self._current_stream.id, 'stopped'),
+        )
 
     async def async_media_pause(self):
-        await self._client.pause_stream(self._current_stream.id)
-        await self.async_update()
+        await self.coordinator.async_command(
+            self._client.pause_stream(self._current_stream.id),
+            self.coordinator.data.with_stream_state(self._current_stream.id, 'paused'),
+        )
 
     async def async_media_previous_track(self):
-        await self._client.previous_stream(self._current_stream.id)
-        await self.async_update()
+        await self.coordinator.async_command(self._client.previous_stream(self._current_stream.id))
 
     async def async_media_next_track(self):
-        await self._client.next_stream(self._current_stream.id)
-        await self.async_update()
+        await self.coordinator.async_command(self._client.next_stream(self._current_stream.id))
 
 class AmpliPiAnnouncer(MediaPlayerEntity):
     
@@ -1049,6 +1061,7 @@ class AmpliPiAnnouncer(MediaPlayerEntity):
             content_filter=lambda item: item.media_content_type.startswith("audio/"),
         )
 
+    @interactive_command
     async def async_play_media(self, media_type, media_id, **kwargs):
         _LOGGER.warning(f'Play Media {media_type} {media_id} {kwargs}')
         if media_source.is_media_source_id(media_id):
@@ -1066,6 +1079,7 @@ class AmpliPiAnnouncer(MediaPlayerEntity):
         pass
 
 
+    @interactive_command
     async def async_set_volume_level(self, volume):
         if volume is None:
             return
@@ -0,0 +1,117 @@
+"""Push updates from the AmpliPi controller, with polling as the fallback."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from urllib.parse import urljoin
+
+from aiohttp import ClientSession, ClientTimeout
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.json import json_loads
+
+from .const import PUSH_PATH, PUSH_BACKOFF_MIN, PUSH_BACKOFF_MAX, PUSH_READ_TIMEOUT
+from .coordinator import AmpliPiDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PushUnsupported(Exception):
+    """The controller does not serve an event stream."""
+
+
+class AmpliPiPushListener:
+    """Keeps an event stream open to the controller and feeds its status updates into the coordinator.
+
+    Each ``data:`` line of the stream carries a status document, either the
+    full status or a delta with just the objects that changed. While the
+    stream is connected the coordinator stops polling. A stream that was
+    delivering events or keep-alive comments is reopened promptly when it
+    ends; one that fails without delivering anything resumes polling and is
+    retried with exponential backoff. Controllers without an event stream
+    simply keep polling and are retried at the maximum backoff.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: AmpliPiDataUpdateCoordinator,
+                 session: ClientSession, endpoint: str):
+        self._hass = hass
+        self._coordinator = coordinator
+        self._session = session
+        self._url = urljoin(endpoint, PUSH_PATH)
+        self._task: asyncio.Task | None = None
+        self.connected = False
+        # whether the current connection delivered anything, events or keep-alive comments
+        self._active = False
+
+    @callback
+    def async_start(self):
+        """Start listening in the background."""
+        self._task = self._hass.async_create_background_task(
+            self._run(), name=f"amplipi push listener {self._url}"
+        )
+
+    async def async_stop(self):
+        """Stop listening and close the stream."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+
+    async def _run(self):
+        backoff = PUSH_BACKOFF_MIN
+        while True:
+            self._active = False
+            try:
+                await self._listen()
+            except PushUnsupported:
+                _LOGGER.debug("AmpliPi at %s has no event stream, polling instead", self._url)
+                backoff = PUSH_BACKOFF_MAX
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("AmpliPi event stream %s dropped: %s", self._url, err)
+
+            if self._active:
+                # a working stream that went quiet until the read timeout, or was closed, is reopened
+                # after the shortest delay and without switching polling back on
+                backoff = PUSH_BACKOFF_MIN
+                await asyncio.sleep(backoff)
+                continue
+
+            # a stream that fails or closes before delivering anything is retried with backoff
+            self._set_connected(False)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, PUSH_BACKOFF_MAX)
+
+    async def _listen(self):
+        """Read the event stream until it closes."""
+        async with self._session.get(
+                self._url,
+                headers={'Accept': 'text/event-stream'},
+                timeout=ClientTimeout(total=None, sock_connect=10, sock_read=PUSH_READ_TIMEOUT),
+        ) as response:
+            if response.status in (404, 405):
+                raise PushUnsupported
+            response.raise_for_status()
+            if response.content_type != 'text/event-stream':
+                raise PushUnsupported
+
+            async for line in response.content:
+                line = line.strip()
+                if line:
+                    self._active = True
+                if not line.startswith(b'data:'):
+                    continue
+                self._coordinator.async_apply_push(json_loads(line[5:]))
+                # only a stream that actually delivers updates replaces polling
+                self._set_connected(True)
+
+    def _set_connected(self, connected: bool):
+        if connected == self.connected:
+            return
+        self.connected = connected
+        _LOGGER.info("AmpliPi push updates %s", "connected" if connected else "disconnected, polling")
+        self._coordinator.async_set_push_connected(connected)
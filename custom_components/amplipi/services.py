@@ -0,0 +1,131 @@
+"""Services for the AmpliPi integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from pyamplipi.models import ZoneUpdate, MultiZoneUpdate, SourceUpdate
+
+from .const import DOMAIN, COORDINATOR, SERVICE_BULK_UPDATE
+from .coordinator import AmpliPiDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_ZONES = "zones"
+ATTR_GROUPS = "groups"
+ATTR_SOURCES = "sources"
+
+_ZONE_CHANGE_SCHEMA = vol.Schema(
+    {
+        vol.Required("id"): vol.Coerce(int),
+        vol.Optional("source_id"): vol.Coerce(int),
+        vol.Optional("mute"): cv.boolean,
+        vol.Optional("vol_f"): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+        vol.Optional("disabled"): cv.boolean,
+    }
+)
+
+# groups carry no disabled flag of their own
+_GROUP_CHANGE_SCHEMA = vol.Schema(
+    {
+        vol.Required("id"): vol.Coerce(int),
+        vol.Optional("source_id"): vol.Coerce(int),
+        vol.Optional("mute"): cv.boolean,
+        vol.Optional("vol_f"): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+    }
+)
+
+_SOURCE_CHANGE_SCHEMA = vol.Schema(
+    {
+        vol.Required("id"): vol.Coerce(int),
+        vol.Optional("input"): cv.string,
+        vol.Optional("name"): cv.string,
+    }
+)
+
+BULK_UPDATE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_ZONES, default=[]): vol.All(cv.ensure_list, [_ZONE_CHANGE_SCHEMA]),
+        vol.Optional(ATTR_GROUPS, default=[]): vol.All(cv.ensure_list, [_GROUP_CHANGE_SCHEMA]),
+        vol.Optional(ATTR_SOURCES, default=[]): vol.All(cv.ensure_list, [_SOURCE_CHANGE_SCHEMA]),
+    }
+)
+
+
+def compile_zone_updates(zones: list[dict], groups: list[dict]) -> list[MultiZoneUpdate]:
+    """Group zone and group changes that share an identical ZoneUpdate into one MultiZoneUpdate each."""
+    batches: dict[str, MultiZoneUpdate] = {}
+
+    for target, changes in ((ATTR_ZONES, zones), (ATTR_GROUPS, groups)):
+        for change in changes:
+            fields = {key: value for key, value in change.items() if key != "id"}
+            if not fields:
+                continue
+            update = ZoneUpdate(**fields)
+            key = update.model_dump_json(exclude_none=True)
+            batch = batches.setdefault(key, MultiZoneUpdate(zones=[], groups=[], update=update))
+            getattr(batch, target).append(change["id"])
+
+    for batch in batches.values():
+        batch.zones = batch.zones or None
+        batch.groups = batch.groups or None
+
+    return list(batches.values())
+
+
+def _get_coordinator(hass: HomeAssistant, call: ServiceCall) -> AmpliPiDataUpdateCoordinator:
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+
+    if entry_id is None:
+        if len(entries) != 1:
+            raise HomeAssistantError(
+                f"{ATTR_CONFIG_ENTRY_ID} is required when {len(entries)} AmpliPi controllers are configured"
+            )
+        entry_id = next(iter(entries))
+
+    if entry_id not in entries:
+        raise HomeAssistantError(f"No AmpliPi controller is configured with entry id {entry_id}")
+
+    return entries[entry_id][COORDINATOR]
+
+
+async def async_setup_services(hass: HomeAssistant):
+    """Register the AmpliPi services."""
+
+    async def async_bulk_update(call: ServiceCall):
+        coordinator = _get_coordinator(hass, call)
+        client = coordinator.client
+
+        zone_updates = compile_zone_updates(call.data[ATTR_ZONES], call.data[ATTR_GROUPS])
+        source_updates = [
+            (change["id"], SourceUpdate(**{key: value for key, value in change.items() if key != "id"}))
+            for change in call.data[ATTR_SOURCES]
+        ]
+        _LOGGER.debug("Bulk update compiled to %d zone and %d source requests",
+                      len(zone_updates), len(source_updates))
+
+        if not zone_updates and not source_updates:
+            return
+
+        async def async_write():
+            status = None
+            # the controller applies writes one at a time, so the answer to the one that
+            # finishes last already carries the changes of all the others
+            for write in asyncio.as_completed([
+                *(client.set_source(source_id, update) for source_id, update in source_updates),
+                *(client.set_zones(update) for update in zone_updates),
+            ]):
+                status = await write
+            return status
+
+        await coordinator.async_command(async_write())
+
+    if not hass.services.has_service(DOMAIN, SERVICE_BULK_UPDATE):
+        hass.services.async_register(DOMAIN, SERVICE_BULK_UPDATE, async_bulk_update, schema=BULK_UPDATE_SCHEMA)
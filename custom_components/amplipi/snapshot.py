@@ -0,0 +1,230 @@
+"""Indexed view of an AmpliPi status used by every entity."""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from pyamplipi.models import Status, ZoneUpdate, SourceUpdate
+
+# ZoneUpdate fields the controller applies to every zone addressed by a command
+_ZONE_FIELDS = ('source_id', 'mute', 'vol_f', 'disabled')
+# ZoneUpdate fields that are also reflected on the group itself
+_GROUP_FIELDS = ('source_id', 'mute', 'vol_f')
+
+
+def parse_stream_id(source_input: Optional[str]) -> Optional[int]:
+    """Return the stream id a source input such as 'stream=1000' points at, if any."""
+    if source_input is None or 'stream=' not in source_input or 'stream=local' in source_input:
+        return None
+    try:
+        return int(source_input.split('=')[1])
+    except ValueError:
+        return None
+
+
+class _Record:
+    """Read-only view of one object in the status document, holding only the fields the entities use.
+
+    Records are built straight from the decoded JSON, which is far cheaper
+    than validating the pyamplipi models, and compare by value so entities
+    can tell whether their slice of the status changed.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, raw: dict[str, Any]):
+        for field in self.__slots__:
+            object.__setattr__(self, field, raw.get(field))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class ZoneRecord(_Record):
+    __slots__ = ('id', 'name', 'source_id', 'mute', 'vol_f', 'disabled')
+
+
+class GroupRecord(_Record):
+    __slots__ = ('id', 'name', 'source_id', 'zones', 'mute', 'vol_f')
+
+    def __init__(self, raw: dict[str, Any]):
+        super().__init__(raw)
+        object.__setattr__(self, 'zones', tuple(self.zones or ()))
+
+
+class SourceInfoRecord(_Record):
+    __slots__ = ('name', 'state', 'artist', 'track', 'album', 'station', 'img_url', 'supported_cmds')
+
+    def __init__(self, raw: dict[str, Any]):
+        super().__init__(raw)
+        object.__setattr__(self, 'supported_cmds', tuple(self.supported_cmds or ()))
+
+
+class SourceRecord(_Record):
+    __slots__ = ('id', 'name', 'input', 'info')
+
+    def __init__(self, raw: dict[str, Any]):
+        super().__init__(raw)
+        info = raw.get('info')
+        object.__setattr__(self, 'info', SourceInfoRecord(info) if info is not None else None)
+
+
+class StreamRecord(_Record):
+    __slots__ = ('id', 'name', 'type')
+
+
+class AmpliPiSnapshot:
+    """A controller status document indexed once per fetch.
+
+    Lookups by id and the zone/group/source relationships are resolved here so
+    entities never scan the raw status lists themselves. The decoded document
+    is kept as is for saving and for merging pushed updates.
+    """
+
+    def __init__(self, document: dict[str, Any]):
+        self.document = document
+
+        self.zones: Dict[int, ZoneRecord] = {
+            zone.id: zone for zone in map(ZoneRecord, document.get('zones') or [])
+        }
+        self.groups: Dict[int, GroupRecord] = {
+            group.id: group for group in map(GroupRecord, document.get('groups') or [])
+        }
+        self.sources: Dict[int, SourceRecord] = {
+            source.id: source for source in map(SourceRecord, document.get('sources') or [])
+        }
+        self.streams: Dict[int, StreamRecord] = {
+            stream.id: stream for stream in map(StreamRecord, document.get('streams') or [])
+        }
+        self.streams_by_name: Dict[str, StreamRecord] = {}
+        for stream in self.streams.values():
+            self.streams_by_name.setdefault(stream.name, stream)
+
+        self.source_stream_ids: Dict[int, Optional[int]] = {
+            source.id: parse_stream_id(source.input) for source in self.sources.values()
+        }
+
+        self.group_zones: Dict[int, List[ZoneRecord]] = {}
+        self.zone_groups: Dict[int, List[GroupRecord]] = {}
+        for group in self.groups.values():
+            members = [self.zones[zone_id] for zone_id in group.zones if zone_id in self.zones]
+            self.group_zones[group.id] = members
+            for zone in members:
+                self.zone_groups.setdefault(zone.id, []).append(group)
+
+        self.source_zones: Dict[int, List[ZoneRecord]] = {}
+        for zone in self.zones.values():
+            self.source_zones.setdefault(zone.source_id, []).append(zone)
+
+        self.source_groups: Dict[int, List[GroupRecord]] = {}
+        for group in self.groups.values():
+            self.source_groups.setdefault(group.source_id, []).append(group)
+
+    @classmethod
+    def from_status(cls, status: Status) -> AmpliPiSnapshot:
+        """Index a status that pyamplipi already parsed, such as the answer to a command."""
+        return cls(status.model_dump(mode='json'))
+
+    def stream_for_source(self, source_id: Optional[int]) -> Optional[StreamRecord]:
+        """Return the stream currently connected to a source."""
+        stream_id = self.source_stream_ids.get(source_id)
+        if stream_id is None:
+            return None
+        return self.streams.get(stream_id)
+
+    def with_zone_update(self, update: ZoneUpdate, zones: Optional[Iterable[int]] = None,
+                         groups: Optional[Iterable[int]] = None) -> AmpliPiSnapshot:
+        """Return a copy with a zone update applied the way the controller is expected to apply it."""
+        fields = update.model_dump(exclude_none=True)
+        zone_ids = set(zones or [])
+        group_ids = set(groups or [])
+        document = dict(self.document)
+
+        group_changes = {field: fields[field] for field in _GROUP_FIELDS if field in fields}
+        document['groups'] = [self._changed(group, group_changes) if group['id'] in group_ids else group
+                              for group in document.get('groups') or []]
+        for group in document['groups']:
+            if group['id'] in group_ids:
+                zone_ids.update(group['zones'])
+
+        zone_changes = {field: fields[field] for field in _ZONE_FIELDS if field in fields}
+        document['zones'] = [self._changed(zone, zone_changes) if zone['id'] in zone_ids else zone
+                             for zone in document.get('zones') or []]
+
+        return AmpliPiSnapshot(document)
+
+    def with_source_update(self, source_id: int, update: SourceUpdate) -> AmpliPiSnapshot:
+        """Return a copy with a source update applied."""
+        changes = update.model_dump(exclude_none=True)
+        document = dict(self.document)
+        document['sources'] = [self._changed(source, changes) if source['id'] == source_id else source
+                               for source in document.get('sources') or []]
+        return AmpliPiSnapshot(document)
+
+    def with_stream_state(self, stream_id: int, state: str) -> AmpliPiSnapshot:
+        """Return a copy where every source playing the given stream reports a new playback state."""
+        document = dict(self.document)
+        document['sources'] = [
+            self._changed(source, {'info': self._changed(source['info'], {'state': state})})
+            if source.get('info') is not None and self.source_stream_ids.get(source['id']) == stream_id
+            else source
+            for source in document.get('sources') or []
+        ]
+        return AmpliPiSnapshot(document)
+
+    def with_partial(self, zones: Optional[Iterable[dict[str, Any]]] = None,
+                     groups: Optional[List[dict[str, Any]]] = None,
+                     sources: Optional[List[dict[str, Any]]] = None) -> AmpliPiSnapshot:
+        """Return a copy with separately fetched parts of the status merged in.
+
+        Fetched zones replace the zones with the same id, fetched groups and
+        sources replace the whole list.
+        """
+        document = dict(self.document)
+        if zones:
+            fetched = {zone['id']: zone for zone in zones}
+            document['zones'] = [fetched.get(zone['id'], zone) for zone in document.get('zones') or []]
+        if groups is not None:
+            document['groups'] = groups
+        if sources is not None:
+            document['sources'] = sources
+        return AmpliPiSnapshot(document)
+
+    def with_changes(self, changes: dict[str, Any]) -> AmpliPiSnapshot:
+        """Return a copy with a status delta merged in.
+
+        Lists of objects are merged by id, field by field, so a delta only
+        carries the objects and fields that changed. Anything else replaces
+        the value in the document.
+        """
+        document = dict(self.document)
+        for key, value in changes.items():
+            current = document.get(key)
+            if isinstance(value, list) and isinstance(current, list) and \
+                    all(isinstance(item, dict) and 'id' in item for item in value):
+                changed = {item['id']: item for item in value}
+                merged = [self._changed(item, changed.pop(item['id'])) if item['id'] in changed else item
+                          for item in current]
+                document[key] = merged + list(changed.values())
+            else:
+                document[key] = value
+        return AmpliPiSnapshot(document)
+
+    @staticmethod
+    def _changed(raw: dict[str, Any], changes: dict[str, Any]) -> dict[str, Any]:
+        # the document is shared with older snapshots, so changed objects are copied rather than updated
+        return {**raw, **changes}
@@ -0,0 +1,36 @@
+"""Time album art url resolution for every entity on one poll, with and without the memoized build_url.
+
+Run from the repository root: python scripts/bench_build_url.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# importing the media player component on its own trips a circular import inside Home Assistant
+import homeassistant.components.persistent_notification  # noqa: E402,F401
+
+from custom_components.amplipi.media_player import build_url  # noqa: E402
+
+BASE_PATH = "http://amplipi.local"
+# 36 zones, 4 sources and 4 groups resolving the covers of 5 streams
+ENTITIES = 44
+IMAGES = ["static/imgs/internet_radio.png", "static/imgs/spotify.png", "static/imgs/pandora.png",
+          "http://radio.example/cover.jpg", None]
+
+
+def poll(resolve):
+    for i in range(ENTITIES):
+        resolve(BASE_PATH, IMAGES[i % len(IMAGES)])
+
+
+def main():
+    runs = 200
+    for name, resolve in (("uncached", build_url.__wrapped__), ("memoized", build_url)):
+        elapsed = min(timeit.repeat(lambda: poll(resolve), number=runs, repeat=5)) / runs
+        print(f"{name}: {elapsed * 1e6:.1f} us per poll")
+
+
+if __name__ == "__main__":
+    main()
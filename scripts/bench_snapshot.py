@@ -0,0 +1,90 @@
+"""Compare decoding and indexing a status into pyamplipi models against the slotted snapshot records.
+
+Run from the repository root: python scripts/bench_snapshot.py
+"""
+import gc
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homeassistant.util.json import json_loads  # noqa: E402
+from pyamplipi.models import Status  # noqa: E402
+
+from custom_components.amplipi.snapshot import AmpliPiSnapshot, parse_stream_id  # noqa: E402
+
+STREAMS = 20
+PRESETS = 5
+
+
+def make_status(zones: int) -> bytes:
+    """Return a status body with 4 sources, one group per 6 zones, 20 streams and 5 presets."""
+    streams = [{"id": 1000 + i, "name": f"Stream {i}", "type": "internetradio",
+                "url": f"http://radio.example/{i}", "logo": f"http://radio.example/{i}.png"} for i in range(STREAMS)]
+    return json.dumps({
+        "sources": [{
+            "id": i, "name": f"Input {i + 1}", "input": f"stream={1000 + i}",
+            "info": {"name": "Radio", "state": "playing", "artist": "Artist", "track": "Track", "album": "Album",
+                     "station": "Station", "img_url": "static/imgs/cover.png",
+                     "supported_cmds": ["play", "pause", "next", "prev"]},
+        } for i in range(4)],
+        "zones": [{"id": i, "name": f"Zone {i}", "source_id": i % 4, "mute": False, "vol": -40, "vol_f": 0.5,
+                   "vol_min": -80, "vol_max": 0, "disabled": False} for i in range(zones)],
+        "groups": [{"id": 100 + i, "name": f"Group {i}", "source_id": i % 4, "zones": list(range(i * 6, i * 6 + 6)),
+                    "mute": False, "vol_delta": -40, "vol_f": 0.5} for i in range(zones // 6)],
+        "streams": streams,
+        "presets": [{"id": 10000 + i, "name": f"Preset {i}",
+                     "state": {"zones": [{"id": z, "vol_f": 0.4} for z in range(zones)]}} for i in range(PRESETS)],
+        "info": {"version": "0.4.1"},
+    }).encode()
+
+
+def index_models(body: bytes) -> dict:
+    """The model based index the coordinator built before the slotted records."""
+    status = Status.model_validate(json_loads(body))
+    zones = {zone.id: zone for zone in status.zones}
+    index = {
+        "status": status,
+        "zones": zones,
+        "groups": {group.id: group for group in status.groups},
+        "sources": {source.id: source for source in status.sources},
+        "streams": {stream.id: stream for stream in status.streams},
+        "source_stream_ids": {source.id: parse_stream_id(source.input) for source in status.sources},
+        "group_zones": {group.id: [zones[z] for z in group.zones if z in zones] for group in status.groups},
+        "source_zones": {},
+    }
+    for zone in status.zones:
+        index["source_zones"].setdefault(zone.source_id, []).append(zone)
+    return index
+
+
+def index_records(body: bytes) -> AmpliPiSnapshot:
+    return AmpliPiSnapshot(json_loads(body))
+
+
+def retained(build, body: bytes) -> int:
+    """Bytes still allocated after building one index and dropping the body."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(body)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    for zones in (6, 18, 36):
+        body = make_status(zones)
+        for name, build in (("models", index_models), ("records", index_records)):
+            runs = 2000
+            elapsed = min(timeit.repeat(lambda: build(body), number=runs, repeat=5)) / runs
+            print(f"{zones:2d} zones {name:7s}: {elapsed * 1000:.3f} ms, {retained(build, body) / 1024:.0f} KiB retained")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Fixtures for AmpliPi tests."""
+import asyncio
+
+import pytest
+import pytest_socket
+from aiohttp.test_utils import TestServer
+from homeassistant.const import CONF_HOST, CONF_PORT, CONF_NAME, CONF_ID
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.amplipi.const import DOMAIN, CONF_VENDOR, CONF_VERSION, CONF_WEBAPP, CONF_API_PATH
+
+from .stub import StubController
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+@pytest.fixture(autouse=True)
+def allow_local_sockets():
+    # the stub controller is a real aiohttp server on localhost
+    pytest_socket.enable_socket()
+    yield
+
+
+@pytest.fixture
+async def stub():
+    """A stand-in AmpliPi controller served on localhost."""
+    controller = StubController()
+    server = TestServer(controller.app)
+    await server.start_server()
+    controller.server = server
+    yield controller
+    await server.close()
+
+
+def make_entry(server: TestServer, **options) -> MockConfigEntry:
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_NAME: "AmpliPi",
+            CONF_HOST: server.host,
+            CONF_PORT: server.port,
+            CONF_ID: "amplipi",
+            CONF_VENDOR: "MicroNova",
+            CONF_VERSION: "1",
+            CONF_WEBAPP: f"http://{server.host}:{server.port}",
+            CONF_API_PATH: "/api",
+        },
+        options=options,
+    )
+
+
+def get_entity(hass, entity_id: str):
+    """Return the entity object behind an entity id."""
+    return hass.data["media_player"].get_entity(entity_id)
+
+
+async def wait_for_requests(stub, count: int, method: str = "PATCH"):
+    """Wait until the stub controller has received the given number of requests of one method."""
+    while sum(1 for request in stub.requests if request[0] == method) < count:
+        await asyncio.sleep(0.001)
+
+
+@pytest.fixture
+async def setup_entry(hass, stub):
+    """Set up a config entry against the stub controller."""
+    entry = make_entry(stub.server)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    yield entry
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
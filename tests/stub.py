@@ -0,0 +1,185 @@
+"""A stand-in AmpliPi controller serving the parts of the API the integration uses."""
+import asyncio
+import json
+
+from aiohttp import web
+
+
+def make_status(zone_count: int = 6) -> dict:
+    """Return a status document with four sources, a group of the first three zones and two streams."""
+    return {
+        "sources": [
+            {
+                "id": i,
+                "name": f"Input {i + 1}",
+                "input": "stream=1000" if i == 0 else "None",
+                "info": {
+                    "name": "Radio",
+                    "state": "playing" if i == 0 else "stopped",
+                    "artist": "Artist",
+                    "track": "Track",
+                    "album": "Album",
+                    "station": None,
+                    "img_url": "static/imgs/cover.png",
+                    "supported_cmds": ["play", "pause"],
+                },
+            }
+            for i in range(4)
+        ],
+        "zones": [
+            {
+                "id": i,
+                "name": f"Zone {i}",
+                "source_id": 0 if i < 3 else 1,
+                "mute": False,
+                "vol": -40,
+                "vol_f": 0.5,
+                "vol_min": -80,
+                "vol_max": 0,
+                "disabled": False,
+            }
+            for i in range(zone_count)
+        ],
+        "groups": [
+            {"id": 100, "name": "Downstairs", "source_id": 0, "zones": [0, 1, 2], "mute": False, "vol_delta": -40,
+             "vol_f": 0.5},
+        ],
+        "streams": [
+            {"id": 1000, "name": "Groove Salad", "type": "internetradio"},
+            {"id": 996, "name": "Input 1", "type": "rca"},
+        ],
+        "presets": [],
+        "info": {"version": "0.4.1"},
+    }
+
+
+class StubController:
+    """Records every request it receives and applies writes to its status document."""
+
+    def __init__(self, zone_count: int = 6, delay: float = 0.0):
+        self.status = make_status(zone_count)
+        self.requests: list[tuple[str, str]] = []
+        self.delay = delay
+        self.server = None
+        # writes answer 500 while set
+        self.fail_writes = False
+        # status reads answer 500 while set
+        self.fail_reads = False
+        # sent with the status when set, a request carrying it in If-None-Match is answered 304
+        self.etag: str | None = None
+        # the most requests that were being handled at once
+        self.peak_in_flight = 0
+        self._in_flight = 0
+        # status documents to push on /api/events, None to answer 404 like controllers without push
+        self.events: list[dict | str] | None = None
+        self.events_content_type = 'text/event-stream'
+        app = web.Application()
+        app.router.add_get('/api/', self.get_status)
+        app.router.add_get('/api/sources', self.get_sources)
+        app.router.add_get('/api/groups', self.get_groups)
+        app.router.add_get('/api/zones', self.get_zones)
+        app.router.add_get('/api/zones/{id}', self.get_zone)
+        app.router.add_patch('/api/zones/{id}', self.patch_zone)
+        app.router.add_patch('/api/zones', self.patch_zones)
+        app.router.add_patch('/api/sources/{id}', self.patch_source)
+        app.router.add_post('/api/streams/{id}/{cmd}', self.stream_command)
+        app.router.add_get('/api/events', self.get_events)
+        self.app = app
+
+    async def _record(self, request: web.Request):
+        self.requests.append((request.method, request.path))
+        self._in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+        finally:
+            self._in_flight -= 1
+
+    def _failed_write(self) -> web.Response | None:
+        if self.fail_writes:
+            return web.json_response({"error": "write failed"}, status=500)
+        return None
+
+    def _apply(self, zone_id: int, update: dict):
+        for zone in self.status["zones"]:
+            if zone["id"] == zone_id:
+                zone.update({key: value for key, value in update.items() if value is not None})
+
+    async def get_status(self, request: web.Request) -> web.Response:
+        await self._record(request)
+        if self.fail_reads:
+            return web.json_response({"error": "read failed"}, status=500)
+        if self.etag is None:
+            return web.json_response(self.status)
+        if request.headers.get('If-None-Match') == self.etag:
+            return web.Response(status=304, headers={'ETag': self.etag})
+        return web.json_response(self.status, headers={'ETag': self.etag})
+
+    async def get_sources(self, request: web.Request) -> web.Response:
+        await self._record(request)
+        return web.json_response({"sources": self.status["sources"]})
+
+    async def get_groups(self, request: web.Request) -> web.Response:
+        await self._record(request)
+        return web.json_response({"groups": self.status["groups"]})
+
+    async def get_zones(self, request: web.Request) -> web.Response:
+        await self._record(request)
+        return web.json_response({"zones": self.status["zones"]})
+
+    async def get_zone(self, request: web.Request) -> web.Response:
+        await self._record(request)
+        zone_id = int(request.match_info['id'])
+        return web.json_response(next(zone for zone in self.status["zones"] if zone["id"] == zone_id))
+
+    async def patch_zone(self, request: web.Request) -> web.Response:
+        await self._record(request)
+        if (failed := self._failed_write()) is not None:
+            return failed
+        self._apply(int(request.match_info['id']), await request.json())
+        return web.json_response(self.status)
+
+    async def patch_zones(self, request: web.Request) -> web.Response:
+        await self._record(request)
+        if (failed := self._failed_write()) is not None:
+            return failed
+        body = await request.json()
+        for zone_id in body.get("zones") or []:
+            self._apply(zone_id, body["update"])
+        for group_id in body.get("groups") or []:
+            for group in self.status["groups"]:
+                if group["id"] == group_id:
+                    for zone_id in group["zones"]:
+                        self._apply(zone_id, body["update"])
+                    group.update({key: value for key, value in body["update"].items()
+                                  if key in ("mute", "vol_f", "source_id") and value is not None})
+        return web.json_response(self.status)
+
+    async def patch_source(self, request: web.Request) -> web.Response:
+        await self._record(request)
+        if (failed := self._failed_write()) is not None:
+            return failed
+        source_id = int(request.match_info['id'])
+        body = await request.json()
+        for source in self.status["sources"]:
+            if source["id"] == source_id:
+                source.update({key: value for key, value in body.items() if value is not None})
+        return web.json_response(self.status)
+
+    async def stream_command(self, request: web.Request) -> web.Response:
+        await self._record(request)
+        return web.json_response(self.status)
+
+    async def get_events(self, request: web.Request) -> web.StreamResponse:
+        await self._record(request)
+        if self.events is None:
+            return web.Response(status=404)
+        response = web.StreamResponse(headers={'Content-Type': self.events_content_type})
+        await response.prepare(request)
+        for event in self.events:
+            # strings are sent as they are, e.g. ': keep-alive' comments
+            line = event if isinstance(event, str) else f"data: {json.dumps(event)}"
+            await response.write(f"{line}\n\n".encode())
+        await response.write_eof()
+        return response
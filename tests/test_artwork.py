@@ -0,0 +1,91 @@
+"""Tests for the album art cache."""
+import os
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.amplipi.artwork import AlbumArtCache
+
+
+@pytest.fixture
+async def images():
+    """Serves 100 byte images named by a single character, answering 304 to a matching ETag."""
+    requests = []
+
+    async def image(request: web.Request) -> web.Response:
+        name = request.match_info['name']
+        requests.append(name)
+        etag = f'"{name}"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304)
+        return web.Response(body=name.encode() * 100, content_type='image/png', headers={'ETag': etag})
+
+    app = web.Application()
+    app.router.add_get('/img/{name}', image)
+    server = TestServer(app)
+    await server.start_server()
+    server.requests = requests
+    yield server
+    await server.close()
+
+
+def _cache(hass, tmp_path, max_disk=1024) -> AlbumArtCache:
+    return AlbumArtCache(hass, async_get_clientsession(hass), str(tmp_path), 1024, max_disk)
+
+
+async def test_unchanged_image_is_revalidated_without_rewriting(hass, images, tmp_path, monkeypatch):
+    """A 304 serves the cached body and leaves the index on disk alone."""
+    cache = _cache(hass, tmp_path)
+    writes = []
+    write_index = cache._write_index
+    monkeypatch.setattr(cache, '_write_index', lambda index: writes.append(index) or write_index(index))
+    url = str(images.make_url('/img/a'))
+
+    assert await cache.async_get(url) == (b'a' * 100, 'image/png')
+    assert await cache.async_get(url) == (b'a' * 100, 'image/png')
+
+    assert images.requests == ['a', 'a']
+    assert len(writes) == 1
+
+
+async def test_same_track_is_served_without_revalidating(hass, images, tmp_path):
+    """The controller is only asked again once the image hash changes."""
+    cache = _cache(hass, tmp_path)
+    url = str(images.make_url('/img/a'))
+
+    assert await cache.async_get(url, 'first') == (b'a' * 100, 'image/png')
+    assert await cache.async_get(url, 'first') == (b'a' * 100, 'image/png')
+    assert images.requests == ['a']
+
+    assert await cache.async_get(url, 'second') == (b'a' * 100, 'image/png')
+    assert await cache.async_get(url, 'second') == (b'a' * 100, 'image/png')
+    assert images.requests == ['a', 'a']
+
+
+async def test_memory_hit_keeps_disk_copy_recent(hass, images, tmp_path):
+    """Serving an image from memory refreshes its file so disk eviction stays least recently used."""
+    cache = _cache(hass, tmp_path)
+    url = str(images.make_url('/img/a'))
+    await cache.async_get(url)
+    path = next(entry.path for entry in os.scandir(tmp_path) if entry.name != 'index.json')
+    os.utime(path, (0, 0))
+
+    await cache.async_get(url)
+    await hass.async_block_till_done()
+
+    assert os.stat(path).st_mtime > 0
+
+
+async def test_evicted_images_are_forgotten(hass, images, tmp_path):
+    """Urls whose body was evicted from disk are dropped from the index."""
+    cache = _cache(hass, tmp_path, max_disk=150)
+    first = str(images.make_url('/img/a'))
+    second = str(images.make_url('/img/b'))
+
+    await cache.async_get(first)
+    os.utime(os.path.join(tmp_path, cache._urls[first].content_hash), (0, 0))
+    await cache.async_get(second)
+
+    assert list(cache._urls) == [second]
@@ -0,0 +1,169 @@
+"""Tests for the AmpliPi client layer."""
+import asyncio
+
+import pytest
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.amplipi.client import RequestScheduler, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, \
+    AmpliPiClient, StatusHedger
+
+from .conftest import wait_for_requests
+
+
+def _client(hass, stub, hedger: StatusHedger | None = None) -> AmpliPiClient:
+    endpoint = f"http://{stub.server.host}:{stub.server.port}/api/"
+    return AmpliPiClient(endpoint, 10, http_session=async_get_clientsession(hass), hedger=hedger)
+
+
+def _hedged_client(hass, stub, max_ratio: float = 1.0) -> AmpliPiClient:
+    hedger = StatusHedger(95, max_ratio, 0.01, 1)
+    hedger.record(0.01)
+    return _client(hass, stub, hedger)
+
+
+async def _slow_read(client: AmpliPiClient, stub) -> int:
+    """Read the status with the first request stalled and any hedge answered right away.
+
+    Returns the number of requests the read sent.
+    """
+    stub.requests.clear()
+    client.invalidate_status()
+    stub.delay = 0.2
+    read = asyncio.create_task(client.get_status_document())
+    await wait_for_requests(stub, 1, "GET")
+    stub.delay = 0
+    await read
+    return len(stub.requests)
+
+
+async def _queue(scheduler: RequestScheduler, priority: int, order: list, name: str):
+    async with scheduler.slot(priority):
+        order.append(name)
+
+
+async def test_waiter_cancelled_while_queued():
+    """A request cancelled while waiting leaves the queue and the slot count as they were."""
+    scheduler = RequestScheduler(1)
+    holder = scheduler.slot()
+    await holder.__aenter__()
+    waiter = asyncio.create_task(_queue(scheduler, PRIORITY_BACKGROUND, [], "waiter"))
+    await asyncio.sleep(0)
+    assert scheduler.waiting == 1
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert scheduler.waiting == 0
+    assert scheduler.lanes[PRIORITY_BACKGROUND].waiting == 0
+
+    await holder.__aexit__(None, None, None)
+    assert scheduler.in_flight == 0
+
+
+async def test_waiter_cancelled_after_grant():
+    """A slot handed to a request that is cancelled before it runs is released again."""
+    scheduler = RequestScheduler(1)
+    holder = scheduler.slot()
+    await holder.__aenter__()
+    order = []
+    waiter = asyncio.create_task(_queue(scheduler, PRIORITY_BACKGROUND, order, "waiter"))
+    await asyncio.sleep(0)
+
+    # releasing hands the slot straight to the waiter, which is cancelled before it can use it
+    await holder.__aexit__(None, None, None)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    assert order == []
+    assert scheduler.in_flight == 0
+    assert scheduler.waiting == 0
+    async with scheduler.slot():
+        assert scheduler.in_flight == 1
+    assert scheduler.in_flight == 0
+
+
+async def test_interactive_lane_goes_first():
+    """Queued interactive requests get a slot before background requests that queued earlier."""
+    scheduler = RequestScheduler(1)
+    holder = scheduler.slot()
+    await holder.__aenter__()
+    order = []
+    tasks = [
+        asyncio.create_task(_queue(scheduler, PRIORITY_BACKGROUND, order, "poll 1")),
+        asyncio.create_task(_queue(scheduler, PRIORITY_BACKGROUND, order, "poll 2")),
+        asyncio.create_task(_queue(scheduler, PRIORITY_INTERACTIVE, order, "volume")),
+        asyncio.create_task(_queue(scheduler, PRIORITY_INTERACTIVE, order, "mute")),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.interactive_pending
+
+    await holder.__aexit__(None, None, None)
+    await asyncio.gather(*tasks)
+
+    assert order == ["volume", "mute", "poll 1", "poll 2"]
+    assert scheduler.in_flight == 0
+    assert not scheduler.interactive_pending
+
+
+async def test_hedge_wins_over_a_stalled_read(hass, stub):
+    """A read slower than the hedge delay gets a duplicate, and the stall is recorded for the next delay."""
+    client = _hedged_client(hass, stub)
+
+    assert await _slow_read(client, stub) == 2
+
+    hedger = client.hedger
+    assert (hedger.reads, hedger.fired, hedger.won) == (1, 1, 1)
+    # the primed sample, the hedge and the cancelled primary
+    assert len(hedger._latencies) == 3
+
+
+async def test_hedges_are_capped(hass, stub):
+    """No more than max_ratio of the reads are hedged."""
+    client = _hedged_client(hass, stub, max_ratio=0.5)
+
+    assert await _slow_read(client, stub) == 2
+    assert await _slow_read(client, stub) == 1
+
+    hedger = client.hedger
+    assert (hedger.reads, hedger.fired, hedger.won) == (2, 1, 1)
+
+
+async def test_both_hedged_reads_failing(hass, stub):
+    """When the hedge and the original read both fail the read fails."""
+    client = _hedged_client(hass, stub)
+    stub.fail_reads = True
+
+    with pytest.raises(Exception):
+        await _slow_read(client, stub)
+
+    hedger = client.hedger
+    assert (hedger.reads, hedger.fired, hedger.won) == (1, 1, 0)
+
+
+async def test_identical_status_is_decoded_once(hass, stub):
+    """A status body identical to the previous one returns the document already decoded."""
+    client = _client(hass, stub)
+    first = await client.get_status_document()
+    client.invalidate_status()
+
+    assert await client.get_status_document() is first
+    assert client.unchanged_reads == 1
+
+    stub.status["zones"][0]["vol_f"] = 0.25
+    client.invalidate_status()
+    changed = await client.get_status_document()
+    assert changed is not first
+    assert changed["zones"][0]["vol_f"] == 0.25
+    assert client.unchanged_reads == 1
+
+
+async def test_not_modified_status_reuses_document(hass, stub):
+    """A 304 answer to the controller's ETag returns the document already decoded."""
+    stub.etag = '"1"'
+    client = _client(hass, stub)
+    first = await client.get_status_document()
+    client.invalidate_status()
+    # a changed body would be decoded again, so the reuse can only come from the 304
+    stub.status["zones"][0]["vol_f"] = 0.25
+
+    assert await client.get_status_document() is first
+    assert client.unchanged_reads == 1
@@ -0,0 +1,103 @@
+"""Tests for command buffering and batching against the stub controller."""
+import asyncio
+
+import pytest
+
+from .conftest import get_entity, wait_for_requests
+
+
+def _patches(stub) -> list[tuple[str, str]]:
+    return [request for request in stub.requests if request[0] == "PATCH"]
+
+
+async def test_newest_volume_wins(hass, stub, setup_entry):
+    """Volumes set while a write is in flight collapse into one trailing write of the newest value."""
+    zone = get_entity(hass, "media_player.amplipi_zone_0")
+    stub.delay = 0.05
+    stub.requests.clear()
+
+    first = asyncio.create_task(zone.async_set_volume_level(0.1))
+    await wait_for_requests(stub, 1)
+    await asyncio.gather(
+        first,
+        zone.async_set_volume_level(0.2),
+        zone.async_set_volume_level(0.3),
+        zone.async_set_volume_level(0.4),
+    )
+
+    assert _patches(stub) == [("PATCH", "/api/zones"), ("PATCH", "/api/zones")]
+    assert stub.status["zones"][0]["vol_f"] == 0.4
+
+
+async def test_failed_write_drops_pending_fields(hass, stub, setup_entry):
+    """A failed write does not carry its fields into the next one."""
+    zone = get_entity(hass, "media_player.amplipi_zone_0")
+    stub.fail_writes = True
+
+    with pytest.raises(Exception):
+        await zone.async_mute_volume(True)
+
+    stub.fail_writes = False
+    stub.requests.clear()
+    await zone.async_set_volume_level(0.3)
+
+    assert _patches(stub) == [("PATCH", "/api/zones")]
+    assert stub.status["zones"][0]["vol_f"] == 0.3
+    assert stub.status["zones"][0]["mute"] is False
+
+
+async def test_volume_steps_accumulate(hass, stub, setup_entry):
+    """Steps pressed while a write is in flight go out as one write of their net delta."""
+    zone = get_entity(hass, "media_player.amplipi_zone_0")
+    step = zone._volume_step
+    stub.delay = 0.05
+    stub.requests.clear()
+
+    first = asyncio.create_task(zone.async_volume_up())
+    await wait_for_requests(stub, 1)
+    await asyncio.gather(
+        first,
+        zone.async_volume_up(),
+        zone.async_volume_up(),
+        zone.async_volume_down(),
+    )
+
+    assert _patches(stub) == [("PATCH", "/api/zones"), ("PATCH", "/api/zones")]
+    assert stub.status["zones"][0]["vol_f"] == pytest.approx(0.5 + 2 * step)
+
+
+async def test_identical_updates_share_one_request(hass, stub, setup_entry):
+    """The same volume set on several zones at once is sent as one MultiZoneUpdate."""
+    zones = [get_entity(hass, f"media_player.amplipi_zone_{zone_id}") for zone_id in range(3)]
+    stub.requests.clear()
+
+    await asyncio.gather(*(zone.async_set_volume_level(0.3) for zone in zones))
+
+    assert _patches(stub) == [("PATCH", "/api/zones")]
+    assert [zone["vol_f"] for zone in stub.status["zones"][:3]] == [0.3, 0.3, 0.3]
+
+
+async def test_distinct_updates_go_out_concurrently(hass, stub, setup_entry):
+    """Different payloads are separate requests sent side by side."""
+    zones = [get_entity(hass, f"media_player.amplipi_zone_{zone_id}") for zone_id in range(2)]
+    stub.delay = 0.05
+    stub.requests.clear()
+    stub.peak_in_flight = 0
+
+    await asyncio.gather(zones[0].async_set_volume_level(0.3), zones[1].async_set_volume_level(0.4))
+
+    assert _patches(stub) == [("PATCH", "/api/zones"), ("PATCH", "/api/zones")]
+    assert stub.peak_in_flight == 2
+    assert [zone["vol_f"] for zone in stub.status["zones"][:2]] == [0.3, 0.4]
+
+
+async def test_batch_error_reaches_every_caller(hass, stub, setup_entry):
+    """Every caller whose update was in a failed batch sees the error."""
+    zones = [get_entity(hass, f"media_player.amplipi_zone_{zone_id}") for zone_id in range(3)]
+    stub.fail_writes = True
+    stub.requests.clear()
+
+    results = await asyncio.gather(*(zone.async_set_volume_level(0.3) for zone in zones), return_exceptions=True)
+
+    assert _patches(stub) == [("PATCH", "/api/zones")]
+    assert all(isinstance(result, Exception) for result in results)
@@ -0,0 +1,17 @@
+"""Tests for the AmpliPi config flow."""
+import time
+
+from custom_components.amplipi.config_flow import async_retrieve_info
+from custom_components.amplipi.const import PROBED_STATUS, PROBE_FRESHNESS
+
+
+async def test_probe_drops_stale_statuses(hass, stub):
+    """Storing a probed status discards probes too old to seed an entry."""
+    hass.data[PROBED_STATUS] = {
+        ("stale.local", 80): (time.monotonic() - PROBE_FRESHNESS - 1, None),
+        ("fresh.local", 80): (time.monotonic(), None),
+    }
+
+    await async_retrieve_info(hass, stub.server.host, stub.server.port)
+
+    assert set(hass.data[PROBED_STATUS]) == {("fresh.local", 80), (stub.server.host, stub.server.port)}
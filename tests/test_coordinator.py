@@ -0,0 +1,207 @@
+"""Tests for the AmpliPi status coordinator."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+
+from pyamplipi.models import Status
+
+from custom_components.amplipi.client import PRIORITY_INTERACTIVE
+from custom_components.amplipi.const import DOMAIN, COORDINATOR
+from custom_components.amplipi.coordinator import _plan_fetch
+
+from .conftest import get_entity, make_entry, wait_for_requests
+
+
+async def test_refresh_makes_one_request(hass, stub, setup_entry):
+    """Every entity is updated from a single status read per refresh."""
+    coordinator = hass.data[DOMAIN][setup_entry.entry_id][COORDINATOR]
+    stub.status["zones"][0]["vol_f"] = 0.25
+    stub.requests.clear()
+
+    coordinator.client.invalidate_status()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert stub.requests == [("GET", "/api/")]
+    assert hass.states.get("media_player.amplipi_zone_0").attributes["volume_level"] == 0.25
+    assert len(hass.states.async_all("media_player")) == 12
+
+
+async def test_unchanged_status_reuses_index(hass, stub, setup_entry):
+    """A refresh returning the same status document republishes the snapshot already indexed for it."""
+    coordinator = hass.data[DOMAIN][setup_entry.entry_id][COORDINATOR]
+    first = coordinator.data
+
+    coordinator.client.invalidate_status()
+    await coordinator.async_refresh()
+
+    assert coordinator.client.unchanged_reads == 1
+    assert coordinator.data is first
+
+
+async def test_command_answer_is_indexed_as_decoded(hass, stub, setup_entry, monkeypatch):
+    """The status a command answers with is published without parsing it into pyamplipi models."""
+    zone = get_entity(hass, "media_player.amplipi_zone_0")
+    stub.requests.clear()
+
+    def model_validate(*args, **kwargs):
+        raise AssertionError("command answers are not validated")
+
+    monkeypatch.setattr(Status, "model_validate", model_validate)
+    await zone.async_mute_volume(True)
+    await hass.async_block_till_done()
+
+    assert stub.requests == [("PATCH", "/api/zones")]
+    assert hass.states.get("media_player.amplipi_zone_0").attributes["is_volume_muted"] is True
+
+
+async def test_reconcile_is_not_skipped(hass, stub, setup_entry):
+    """The refresh after a failed command runs even while other commands wait for the controller."""
+    coordinator = hass.data[DOMAIN][setup_entry.entry_id][COORDINATOR]
+    lane = coordinator.client.scheduler.lanes[PRIORITY_INTERACTIVE]
+    coordinator.client.invalidate_status()
+    stub.requests.clear()
+
+    lane.waiting += 1
+    try:
+        await coordinator.async_refresh()
+        assert stub.requests == []
+        assert coordinator.skipped_refreshes == 1
+
+        await coordinator._async_reconcile()
+        assert stub.requests == [("GET", "/api/")]
+        assert coordinator.skipped_refreshes == 1
+    finally:
+        lane.waiting -= 1
+
+
+async def test_restored_status_needs_a_live_read(hass, hass_storage, stub):
+    """A status restored while the controller is offline does not keep entities available."""
+    entry = make_entry(stub.server)
+    hass_storage[f"{DOMAIN}.{entry.entry_id}.status"] = {"version": 1, "key": "status", "data": stub.status}
+    await stub.server.close()
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    assert hass.states.get("media_player.amplipi_zone_0").state == "playing"
+
+    await hass.data[DOMAIN][entry.entry_id][COORDINATOR].async_refresh()
+    await hass.async_block_till_done()
+
+    assert hass.states.get("media_player.amplipi_zone_0").state == "unavailable"
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_read_started_before_command_is_discarded(hass, stub, setup_entry):
+    """A status read already under way when a command starts does not overwrite its optimistic state."""
+    coordinator = hass.data[DOMAIN][setup_entry.entry_id][COORDINATOR]
+    zone = get_entity(hass, "media_player.amplipi_zone_0")
+    published = []
+
+    @callback
+    def record(event):
+        if event.data["entity_id"] == "media_player.amplipi_zone_0":
+            published.append(event.data["new_state"].attributes.get("volume_level"))
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, record)
+    stub.delay = 0.05
+    coordinator.client.invalidate_status()
+    stub.requests.clear()
+
+    refresh = asyncio.create_task(coordinator.async_refresh())
+    await wait_for_requests(stub, 1, "GET")
+    await zone.async_set_volume_level(0.3)
+    await refresh
+    await hass.async_block_till_done()
+
+    assert published == [0.3]
+
+
+async def test_failed_command_restores_confirmed_state(hass, stub, setup_entry):
+    """A write that fails while the controller is unreachable leaves the last reported state published."""
+    coordinator = hass.data[DOMAIN][setup_entry.entry_id][COORDINATOR]
+    zone = get_entity(hass, "media_player.amplipi_zone_0")
+    await stub.server.close()
+    coordinator.client.invalidate_status()
+
+    with pytest.raises(Exception):
+        await zone.async_set_volume_level(0.3)
+    await hass.async_block_till_done()
+    assert hass.states.get("media_player.amplipi_zone_0").attributes["volume_level"] == 0.5
+
+    await coordinator._async_reconcile()
+    await hass.async_block_till_done()
+
+    state = hass.states.get("media_player.amplipi_zone_0")
+    assert state.state == "playing"
+    assert state.attributes["volume_level"] == 0.5
+
+
+async def test_breaker_backs_off_and_recovers(hass, stub, setup_entry):
+    """Isolated read failures keep the status, repeated ones open the breaker until the controller answers."""
+    coordinator = hass.data[DOMAIN][setup_entry.entry_id][COORDINATOR]
+    zone = get_entity(hass, "media_player.amplipi_zone_0")
+    stub.fail_reads = True
+
+    async def refresh():
+        coordinator.client.invalidate_status()
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        return hass.states.get("media_player.amplipi_zone_0").state
+
+    assert [await refresh() for _ in range(2)] == ["playing", "playing"]
+    assert not coordinator.breaker_open
+
+    intervals = []
+    for _ in range(6):
+        assert await refresh() == "unavailable"
+        intervals.append(coordinator.update_interval.total_seconds())
+    assert coordinator.breaker_open
+    assert intervals == [10, 20, 40, 80, 160, 300]
+
+    stub.requests.clear()
+    with pytest.raises(HomeAssistantError):
+        await zone.async_set_volume_level(0.3)
+    assert stub.requests == []
+
+    stub.fail_reads = False
+    assert await refresh() == "playing"
+    assert not coordinator.breaker_open
+    assert coordinator.update_interval == timedelta(seconds=10)
+
+
+@pytest.mark.parametrize(
+    ("zones", "groups", "sources", "paths"),
+    [
+        ([], False, False, []),
+        ([1, 2], False, False, ["zones/1", "zones/2"]),
+        ([1, 2, 3], False, False, ["zones"]),
+        ([1, 2, 3], True, False, ["zones", "groups"]),
+        ([], True, True, ["groups", "sources"]),
+        ([1, 2], True, False, None),
+        ([1], True, True, None),
+    ],
+)
+def test_plan_fetch(zones, groups, sources, paths):
+    """Up to two zones are read one by one, more as one list, and over two requests become a full read."""
+    assert _plan_fetch(zones, groups, sources) == paths
+
+
+async def test_fetch_reads_only_what_is_needed(hass, stub, setup_entry):
+    """A partial fetch merges the zones it read, a larger one falls back to the full status."""
+    coordinator = hass.data[DOMAIN][setup_entry.entry_id][COORDINATOR]
+    stub.status["zones"][1]["vol_f"] = 0.25
+    stub.requests.clear()
+
+    snapshot = await coordinator.async_fetch(zones=[1])
+    assert stub.requests == [("GET", "/api/zones/1")]
+    assert snapshot.zones[1].vol_f == 0.25
+
+    stub.requests.clear()
+    coordinator.client.invalidate_status()
+    await coordinator.async_fetch(zones=[0, 1], groups=True)
+    assert stub.requests == [("GET", "/api/")]
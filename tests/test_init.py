@@ -0,0 +1,20 @@
+"""Tests for setting up and tearing down AmpliPi config entries."""
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.amplipi.const import DOMAIN, AMPLIPI_OBJECT, ARTWORK
+
+
+async def test_controller_session_closed_on_shutdown(hass, stub, setup_entry):
+    """The controller's own session is closed when Home Assistant shuts down."""
+    session = hass.data[DOMAIN][setup_entry.entry_id][AMPLIPI_OBJECT]._client._http_session
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+
+    assert session.closed
+
+
+async def test_artwork_uses_shared_session(hass, stub, setup_entry):
+    """Album art does not draw on the controller's connection pool."""
+    assert hass.data[DOMAIN][setup_entry.entry_id][ARTWORK]._session is async_get_clientsession(hass)
@@ -0,0 +1,42 @@
+"""Tests for the AmpliPi media player entities."""
+from custom_components.amplipi.const import DOMAIN, COORDINATOR
+
+
+async def _refresh(hass, entry):
+    coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+    coordinator.client.invalidate_status()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    return coordinator
+
+
+async def test_unchanged_status_writes_nothing(hass, stub, setup_entry):
+    """A refresh that returns the same status leaves every entity's state alone."""
+    coordinator = await _refresh(hass, setup_entry)
+    suppressed = coordinator.suppressed_writes
+
+    await _refresh(hass, setup_entry)
+
+    assert coordinator.suppressed_writes - suppressed == 11
+
+
+async def test_new_stream_updates_source_list(hass, stub, setup_entry):
+    """A stream added on the controller shows up in the source entity's source list."""
+    await _refresh(hass, setup_entry)
+    stub.status["streams"].append({"id": 1001, "name": "Drone Zone", "type": "internetradio"})
+
+    await _refresh(hass, setup_entry)
+
+    source_list = hass.states.get("media_player.amplipi_input_1").attributes["source_list"]
+    assert "Drone Zone" in source_list
+
+
+async def test_new_source_updates_zone_source_list(hass, stub, setup_entry):
+    """A source added on the controller shows up in every zone's source list."""
+    await _refresh(hass, setup_entry)
+    stub.status["sources"].append(dict(stub.status["sources"][3], id=4, name="Input 5"))
+
+    await _refresh(hass, setup_entry)
+
+    source_list = hass.states.get("media_player.amplipi_zone_4").attributes["source_list"]
+    assert source_list[-1] == "Source 5"
@@ -0,0 +1,110 @@
+"""Tests for the AmpliPi push listener."""
+import asyncio
+
+import pytest
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.amplipi.const import DOMAIN, COORDINATOR, PUSH_BACKOFF_MIN
+from custom_components.amplipi.push import AmpliPiPushListener, PushUnsupported
+
+
+def _listener(hass, stub, entry) -> AmpliPiPushListener:
+    coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+    return AmpliPiPushListener(hass, coordinator, async_get_clientsession(hass), str(stub.server.make_url('/api/')))
+
+
+async def test_events_update_status(hass, stub, setup_entry):
+    """Pushed status documents are merged and replace polling."""
+    stub.events = [{"zones": [dict(zone, vol_f=0.1) for zone in stub.status["zones"]]}]
+    listener = _listener(hass, stub, setup_entry)
+    coordinator = listener._coordinator
+
+    await listener._listen()
+
+    assert listener.connected
+    assert coordinator.update_interval is None
+    assert coordinator.data.zones[0].vol_f == 0.1
+
+
+async def test_empty_stream_does_not_connect(hass, stub, setup_entry):
+    """A stream that closes before its first event neither connects nor resets the backoff."""
+    stub.events = []
+    listener = _listener(hass, stub, setup_entry)
+
+    await listener._listen()
+
+    assert not listener._active
+    assert not listener.connected
+
+
+async def test_keep_alive_is_activity(hass, stub, setup_entry):
+    """Keep-alive comments mark the stream as working without replacing polling."""
+    stub.events = [": keep-alive"]
+    listener = _listener(hass, stub, setup_entry)
+
+    await listener._listen()
+
+    assert listener._active
+    assert not listener.connected
+
+
+async def test_reconnect_backoff(hass, stub, setup_entry, monkeypatch):
+    """Failing streams back off exponentially, a stream that delivered resets it and reconnects promptly."""
+    listener = _listener(hass, stub, setup_entry)
+    outcomes = [False, False, True, True, False]
+    delays = []
+
+    async def listen():
+        listener._active = outcomes.pop(0)
+        raise asyncio.TimeoutError
+
+    async def sleep(delay):
+        delays.append(delay)
+        if not outcomes:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(listener, '_listen', listen)
+    with monkeypatch.context() as patch, pytest.raises(asyncio.CancelledError):
+        # neither fake yields to the event loop, so nothing else sees the patched sleep
+        patch.setattr(asyncio, 'sleep', sleep)
+        await listener._run()
+
+    assert delays == [PUSH_BACKOFF_MIN, PUSH_BACKOFF_MIN * 2, PUSH_BACKOFF_MIN, PUSH_BACKOFF_MIN, PUSH_BACKOFF_MIN]
+
+
+async def test_missing_event_stream(hass, stub, setup_entry):
+    """Controllers that answer 404 are treated as not supporting push."""
+    listener = _listener(hass, stub, setup_entry)
+
+    with pytest.raises(PushUnsupported):
+        await listener._listen()
+
+    assert not listener.connected
+
+
+async def test_non_event_stream_response(hass, stub, setup_entry):
+    """A 200 that is not an event stream, e.g. the web app's fallback page, is not push."""
+    stub.events = [{"zones": []}]
+    stub.events_content_type = 'text/html'
+    listener = _listener(hass, stub, setup_entry)
+
+    with pytest.raises(PushUnsupported):
+        await listener._listen()
+
+    assert not listener.connected
+    assert len(listener._coordinator.data.zones) == 6
+
+
+async def test_delta_keeps_other_objects(hass, stub, setup_entry):
+    """A delta carrying one zone updates that zone and leaves the others alone."""
+    stub.events = [{"zones": [{"id": 0, "vol_f": 0.1}]}]
+    listener = _listener(hass, stub, setup_entry)
+
+    await listener._listen()
+    await hass.async_block_till_done()
+
+    zones = listener._coordinator.data.zones
+    assert sorted(zones) == [0, 1, 2, 3, 4, 5]
+    assert zones[0].vol_f == 0.1
+    assert zones[0].name == "Zone 0"
+    assert hass.states.get("media_player.amplipi_zone_3").state == "idle"
@@ -0,0 +1,41 @@
+"""Tests for the AmpliPi services."""
+import pytest
+import voluptuous as vol
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.amplipi.const import DOMAIN, COORDINATOR, SERVICE_BULK_UPDATE
+
+
+async def test_bulk_update(hass, stub, setup_entry):
+    """Changes are written without reading the status back, the answers to the writes carry it."""
+    stub.requests.clear()
+
+    await hass.services.async_call(DOMAIN, SERVICE_BULK_UPDATE, {
+        "zones": [{"id": 0, "vol_f": 0.2}, {"id": 1, "mute": True}],
+    }, blocking=True)
+    await hass.async_block_till_done()
+
+    assert stub.requests == [("PATCH", "/api/zones"), ("PATCH", "/api/zones")]
+    assert hass.states.get("media_player.amplipi_zone_0").attributes["volume_level"] == 0.2
+    assert hass.states.get("media_player.amplipi_zone_1").attributes["is_volume_muted"] is True
+
+
+async def test_bulk_update_rejects_disabled_groups(hass, stub, setup_entry):
+    """Groups cannot be disabled, only their zones."""
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(DOMAIN, SERVICE_BULK_UPDATE, {
+            "groups": [{"id": 100, "disabled": True}],
+        }, blocking=True)
+
+
+async def test_bulk_update_fails_fast_while_unreachable(hass, stub, setup_entry):
+    """An open breaker rejects the update without sending anything."""
+    hass.data[DOMAIN][setup_entry.entry_id][COORDINATOR].breaker_open = True
+    stub.requests.clear()
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(DOMAIN, SERVICE_BULK_UPDATE, {
+            "zones": [{"id": 0, "vol_f": 0.2}],
+        }, blocking=True)
+
+    assert stub.requests == []